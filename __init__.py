@@ -1,2 +1,2 @@
-if __name__ == '__main__':
-	...
+if __name__ == '__main__':
+	...
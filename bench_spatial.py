@@ -0,0 +1,164 @@
+from random import Random
+from sys import getsizeof
+from time import perf_counter
+from rect import Pins, PinsArray
+from spatial import PointGrid, RTree
+
+QUERIES = 50
+
+
+def _linear_nearest (xs, ys, px, py, k):
+	d = [(x - px)**2 + (y - py)**2 for x, y in zip(xs, ys)]
+	return sorted(range(len(d)), key=d.__getitem__)[:k]
+
+def _linear_rect (xs, ys, l, t, r, b):
+	return [i for i, (x, y) in enumerate(zip(xs, ys)) if l <= x <= r and t <= y <= b]
+
+def bench_point_grid (sizes = (10**4, 10**5, 10**6), k: int = 8):
+	'`PointGrid` build + k-nearest + box queries against a linear scan'
+	rng = Random(1)
+	for n in sizes:
+		xs = [rng.uniform(0.0, 1000.0) for _ in range(n)]
+		ys = [rng.uniform(0.0, 1000.0) for _ in range(n)]
+		pts = list(zip(xs, ys))
+		qs = [(rng.uniform(0.0, 1000.0), rng.uniform(0.0, 1000.0)) for _ in range(QUERIES)]
+
+		start = perf_counter()
+		grid = PointGrid.from_points(pts)
+		build = perf_counter() - start
+
+		start = perf_counter()
+		for q in qs:
+			grid.nearest(q, k)
+		g_knn = (perf_counter() - start) / QUERIES
+		start = perf_counter()
+		for q in qs:
+			grid.query_rect(Pins(q[0], q[1], q[0] + 10.0, q[1] + 10.0))
+		g_box = (perf_counter() - start) / QUERIES
+
+		scan = qs[:max(1, QUERIES // 10)]
+		start = perf_counter()
+		for q in scan:
+			_linear_nearest(xs, ys, q[0], q[1], k)
+		l_knn = (perf_counter() - start) / len(scan)
+		start = perf_counter()
+		for q in scan:
+			_linear_rect(xs, ys, q[0], q[1], q[0] + 10.0, q[1] + 10.0)
+		l_box = (perf_counter() - start) / len(scan)
+
+		print(f'n={n:>8}  build {build*1e3:8.1f} ms')
+		print(f'  {k}-nearest   grid {g_knn*1e6:10.1f} us   linear {l_knn*1e6:12.1f} us   x{l_knn/g_knn:8.1f}')
+		print(f'  box         grid {g_box*1e6:10.1f} us   linear {l_box*1e6:12.1f} us   x{l_box/g_box:8.1f}')
+
+def bench_bounds (n: int = 200_000):
+	'`Pins.from_points`/`union_all` against an `extend_corners` call per point'
+	from array import array
+	rng = Random(2)
+	pts = [(rng.uniform(-1e3, 1e3), rng.uniform(-1e3, 1e3)) for _ in range(n)]
+	buf = array('d', (c for p in pts for c in p))
+	boxes = [Pins(x, y, x + 1.0, y + 1.0) for x, y in pts]
+
+	start = perf_counter()
+	box = Pins.INF
+	for x, y in pts:
+		box.extend_corners(x, y)
+	slow = perf_counter() - start
+	for name, src in (('tuples', pts), ('buffer', buf)):
+		start = perf_counter()
+		Pins.from_points(src)
+		fast = perf_counter() - start
+		print(f'from_points {name:<8} extend_corners {slow*1e3:8.2f} ms   bulk {fast*1e3:8.2f} ms   x{slow/fast:5.2f}')
+
+	start = perf_counter()
+	box = Pins.INF
+	for b in boxes:
+		box.extend_corners(b._l, b._t)
+		box.extend_corners(b._r, b._b)
+	slow = perf_counter() - start
+	start = perf_counter()
+	Pins.union_all(boxes)
+	fast = perf_counter() - start
+	print(f'union_all            extend_corners {slow*1e3:8.2f} ms   bulk {fast*1e3:8.2f} ms   x{slow/fast:5.2f}')
+
+def bench_rtree (sizes = (10**3, 10**4, 10**5), k: int = 8):
+	'`RTree` bulk load, incremental inserts and queries against scanning every box'
+	rng = Random(3)
+	for n in sizes:
+		boxes = list[Pins]()
+		for _ in range(n):
+			x, y = rng.uniform(0.0, 1000.0), rng.uniform(0.0, 1000.0)
+			boxes.append(Pins(x, y, x + rng.uniform(0.1, 5.0), y + rng.uniform(0.1, 5.0)))
+		qs = [Pins(x, y, x + 20.0, y + 20.0) for x, y in ((rng.uniform(0.0, 1000.0), rng.uniform(0.0, 1000.0)) for _ in range(QUERIES))]
+
+		start = perf_counter()
+		tree = RTree.bulk_load((b, None) for b in boxes)
+		bulk = perf_counter() - start
+		grown = RTree()
+		start = perf_counter()
+		for b in boxes:
+			grown.insert(b)
+		inserts = perf_counter() - start
+
+		timings = list[float]()
+		for t in (tree, grown):
+			start = perf_counter()
+			for q in qs:
+				t.query(q)
+			timings.append((perf_counter() - start) / QUERIES)
+		start = perf_counter()
+		for q in qs:
+			tree.nearest((q._l, q._t), k)
+		knn = (perf_counter() - start) / QUERIES
+
+		scan = qs[:max(1, QUERIES // 10)]
+		start = perf_counter()
+		for q in scan:
+			[i for i, b in enumerate(boxes) if b.intersects(q)]
+		linear = (perf_counter() - start) / len(scan)
+
+		print(f'n={n:>8}  bulk_load {bulk*1e3:8.1f} ms   inserts {inserts*1e3:8.1f} ms')
+		print(f'  box    packed {timings[0]*1e6:10.1f} us   inserted {timings[1]*1e6:10.1f} us   linear {linear*1e6:12.1f} us   x{linear/timings[0]:8.1f}')
+		print(f'  {k}-nearest   {knn*1e6:10.1f} us')
+
+def bench_pins_array (n: int = 10**6):
+	'`PinsArray` column ops against looping over a list of `Pins`'
+	rng = Random(4)
+	boxes = list[Pins]()
+	for _ in range(n):
+		x, y = rng.uniform(0.0, 1000.0), rng.uniform(0.0, 1000.0)
+		boxes.append(Pins(x, y, x + rng.uniform(-5.0, 5.0), y + rng.uniform(-5.0, 5.0)))
+	q = Pins(100.0, 100.0, 300.0, 300.0)
+
+	def normalize_objects ():
+		for p in boxes:
+			p.left, p.right = p._l, p._r
+			p.top, p.bottom = p._t, p._b
+
+	cases = (
+		('build',        lambda: [Pins(p) for p in boxes],                 lambda: PinsArray(boxes)),
+		('width',        lambda: [p.width for p in boxes],                 lambda: arr.width()),
+		('height',       lambda: [p.height for p in boxes],                lambda: arr.height()),
+		('normalize',    normalize_objects,                                lambda: arr.normalize()),
+		('union',        lambda: [p.union(q) for p in boxes],              lambda: arr.union(q)),
+		('query',        lambda: [i for i, p in enumerate(boxes) if p.intersects(q)], lambda: arr.query(q)),
+	)
+	arr = PinsArray(boxes)
+	for name, slow, fast in cases:
+		start = perf_counter()
+		slow()
+		a = perf_counter() - start
+		start = perf_counter()
+		fast()
+		b = perf_counter() - start
+		print(f'{name:<12} objects {a*1e3:9.2f} ms   columns {b*1e3:9.2f} ms   x{a/b:5.2f}')
+	# every side of a `Pins` is its own float object too
+	objects = getsizeof(boxes) + sum(map(getsizeof, boxes)) + 4 * n * getsizeof(0.0)
+	columns = sum(map(getsizeof, (arr.l, arr.t, arr.r, arr.b)))
+	print(f'memory       objects {objects/2**20:9.2f} MB   columns {columns/2**20:9.2f} MB   x{objects/columns:5.2f}')
+
+
+if __name__ == '__main__':
+	bench_point_grid()
+	bench_bounds()
+	bench_rtree()
+	bench_pins_array()
@@ -1,10 +1,12 @@
-from ds_coord import Co2, Co3, Co4
-
-def __main ():
-	a = Co2(10, 20)
-	x, y = a
-	print(x, y)
-
-if __name__ == '__main__':
-	__main()
-
+from ds_coord import Co2, Co3, Co4, FrozenCo2, FrozenCo3, FrozenCo4
+from ds_coord_array import Co2Array, Co3Array, Co4Array, co2_lexsort, co2_weld
+from ds_coord_buffer import Co2View, Co3View, Co4View, pack, unpack
+
+def __main ():
+	a = Co2(10, 20)
+	x, y = a
+	print(x, y)
+
+if __name__ == '__main__':
+	__main()
+
@@ -0,0 +1,177 @@
+import tracemalloc
+from time import perf_counter
+from timeit import timeit
+from array import array
+from itertools import chain
+from ds_coord import CoordBase, Co2, Co3, Co4, _compile_swizzle
+from ds_coord_buffer import pack, unpack, Co3View
+from ds_coord_array import Co2Array, co2_lexsort, co2_weld
+
+NUMBER = 200_000
+
+
+def _report (name: str, generic: float, fast: float):
+	print(f'{name:<24} generic {generic*1e9/NUMBER:8.1f} ns   fast {fast*1e9/NUMBER:8.1f} ns   x{generic/fast:5.2f}')
+
+def bench_specialized ():
+	'Generated fast paths against the generic `CoordBase` implementations'
+	for C, n in ((Co2, 2), (Co3, 3), (Co4, 4)):
+		print(f'-- {C.__name__}')
+		a = C(*(float(i + 1) for i in range(n)))
+		b = C(*(float(i + 2) for i in range(n)))
+		vals = tuple(float(i) for i in range(n))
+		env = dict(a=a, b=b, C=C, B=CoordBase, vals=vals)
+		cases = (
+			('init',       'o = C.__new__(C); B.__init__(o, *vals)', 'C(*vals)'),
+			('a + b',      'B.__add__(a, b)',        'a + b'),
+			('a * 2.0',    'B.__mul__(a, 2.0)',      'a * 2.0'),
+			('a / b',      'B.__truediv__(a, b)',    'a / b'),
+			('-a',         'B.__neg__(a)',           '-a'),
+			('a == b',     'B.__eq__(a, b)',         'a == b'),
+			('a.dot(b)',   'B.dot(a, b)',            'a.dot(b)'),
+			('length_sq',  'B.length_squared(a)',    'a.length_squared()'),
+		)
+		for name, slow, fast in cases:
+			_report(name, timeit(slow, globals=env, number=NUMBER), timeit(fast, globals=env, number=NUMBER))
+
+def bench_swizzle ():
+	'Cached swizzle accessors against resolving the key on every access'
+	a = Co3(1.0, 2.0, 3.0)
+	env = dict(a=a, C=Co3, compile=_compile_swizzle.__wrapped__)
+	for key in ('zyx', 'uv', 'x_z'):
+		print(f'-- {key!r}')
+		_report('get', timeit(f'compile(C, {key!r})[0](a)', globals=env, number=NUMBER),
+		               timeit(f'a[{key!r}]', globals=env, number=NUMBER))
+		_report('set', timeit(f'compile(C, {key!r})[1](a, 1.0)', globals=env, number=NUMBER),
+		               timeit(f'a[{key!r}] = 1.0', globals=env, number=NUMBER))
+
+def _sum_new (pts, acc):
+	for p in pts:
+		acc = acc + p
+	return acc
+
+def _sum_iadd (pts, acc):
+	for p in pts:
+		acc += p
+	return acc
+
+def _sum_into (pts, acc):
+	add_into = Co3.add_into
+	for p in pts:
+		add_into(acc, p, acc)
+	return acc
+
+def _normals_new (tris, acc):
+	for a, b, c in tris:
+		acc = acc + (b - a).cross(c - a)
+	return acc
+
+def _normals_into (tris, acc):
+	e0, e1, n = Co3(), Co3(), Co3()
+	sub_into, cross_into, add_into = Co3.sub_into, Co3.cross_into, Co3.add_into
+	for a, b, c in tris:
+		cross_into(sub_into(b, a, e0), sub_into(c, a, e1), n)
+		add_into(acc, n, acc)
+	return acc
+
+def bench_inplace (count: int = 100_000):
+	'''
+	Accumulation loops with new objects per step against `+=` and the
+	`*_into` kernels, with the peak traced memory over each loop
+	'''
+	pts = [Co3(float(i), float(i+1), float(i+2)) for i in range(count)]
+	tris = list(zip(pts, pts[1:], pts[2:]))
+	cases = (
+		('centroid  acc = acc + p',  _sum_new,      pts),
+		('centroid  acc += p',       _sum_iadd,     pts),
+		('centroid  add_into',       _sum_into,     pts),
+		('normals   new objects',    _normals_new,  tris),
+		('normals   *_into',         _normals_into, tris),
+	)
+	for name, fn, data in cases:
+		start = perf_counter()
+		fn(data, Co3())
+		took = perf_counter() - start
+		tracemalloc.start()
+		base, _ = tracemalloc.get_traced_memory()
+		fn(data, Co3())
+		_, peak = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		print(f'{name:<26} {took*1e9/len(data):8.1f} ns/step   peak {peak-base:6d} B')
+
+def _keep_new (pts, acc, hist):
+	for i, p in enumerate(pts):
+		acc = acc + p
+		hist[i] = acc
+
+def _keep_iadd (pts, acc, hist):
+	for i, p in enumerate(pts):
+		acc += p
+		hist[i] = acc
+
+def _keep_into (pts, acc, hist):
+	add_into = Co3.add_into
+	for i, p in enumerate(pts):
+		hist[i] = add_into(acc, p, acc)
+
+def bench_alloc_counts (count: int = 10_000):
+	'''
+	`tracemalloc` only sees live blocks, so this keeps every step's result
+	alive and counts the blocks that are left over afterwards
+	'''
+	pts = [Co3(float(i), float(i+1), float(i+2)) for i in range(count)]
+	for name, fn in (('acc = acc + p', _keep_new), ('acc += p', _keep_iadd), ('add_into', _keep_into)):
+		hist = [None] * count
+		acc = Co3()
+		tracemalloc.start()
+		before = tracemalloc.take_snapshot()
+		fn(pts, acc, hist)
+		after = tracemalloc.take_snapshot()
+		tracemalloc.stop()
+		blocks = sum(d.count_diff for d in after.compare_to(before, 'filename'))
+		print(f'{name:<26} {blocks / count:5.2f} blocks allocated per step')
+
+def bench_buffers (count: int = 100_000):
+	'`pack`/`unpack`/views against going through `__iter__` per coord'
+	pts = [Co3(float(i), float(i+1), float(i+2)) for i in range(count)]
+	raw = pack(pts).tobytes()
+	env = dict(pts=pts, raw=raw, array=array, chain=chain, pack=pack, unpack=unpack,
+	           Co3=Co3, Co3View=Co3View, memoryview=memoryview)
+	cases = (
+		('pack',   "array('d', chain.from_iterable(pts)).tobytes()", 'pack(pts).tobytes()'),
+		('unpack', "d = array('d', raw); [Co3(*d[i:i+3]) for i in range(0, len(d), 3)]", 'unpack(raw, Co3)'),
+		('views',  "d = array('d', raw); [Co3(*d[i:i+3]) for i in range(0, len(d), 3)]", 'Co3View.over(bytearray(raw))'),
+	)
+	for name, slow, fast in cases:
+		a = timeit(slow, globals=env, number=5) / 5
+		b = timeit(fast, globals=env, number=5) / 5
+		print(f'{name:<24} iter {a*1e3:8.2f} ms   buffer {b*1e3:8.2f} ms   x{a/b:5.2f}')
+
+def bench_lexsort (count: int = 200_000):
+	'`co2_lexsort`/`co2_weld` against sorting and welding the `Co2`s themselves'
+	from random import Random
+	rng = Random(1)
+	pts = [Co2(float(rng.randrange(1000)), float(rng.randrange(1000))) for _ in range(count)]
+	arr = Co2Array(pts)
+	def weld_dict ():
+		seen = dict()
+		return [seen.setdefault(p.freeze(), len(seen)) for p in pts]
+	env = dict(pts=pts, arr=arr, co2_lexsort=co2_lexsort, co2_weld=co2_weld, weld_dict=weld_dict)
+	cases = (
+		('sort Co2 list',  'sorted(range(len(pts)), key=pts.__getitem__)', 'co2_lexsort(pts)'),
+		('sort Co2Array',  'sorted(range(len(pts)), key=pts.__getitem__)', 'co2_lexsort(arr)'),
+		('weld',           'weld_dict()',                                  'co2_weld(arr)'),
+	)
+	for name, slow, fast in cases:
+		a = timeit(slow, globals=env, number=1)
+		b = timeit(fast, globals=env, number=1)
+		print(f'{name:<24} objects {a*1e3:8.2f} ms   columns {b*1e3:8.2f} ms   x{a/b:5.2f}')
+
+
+if __name__ == '__main__':
+	bench_specialized()
+	bench_swizzle()
+	bench_inplace()
+	bench_alloc_counts()
+	bench_buffers()
+	bench_lexsort()
@@ -1,287 +1,707 @@
-from math import sqrt
-from typing import Self
-
-
-def _safe_div (a, b):
-	if b == 0.0:
-		return 0.0
-	return a / b
-
-def _unzip_input (*args):
-	if len(args) == 1 and isinstance(args[0], tuple|list):
-		args = args[0]
-	for value in args:
-		if hasattr(value, '__iter__'):
-			for v in value:
-				yield v
-			continue
-		yield value
-
-def _co2_leq (a0, a1, b0, b1) -> bool:
-	return (a0 < b0) or (a0 == b0 and a1 <= b1)
-
-
-class CoordBase:
-	__slots__ = ()
-	__alias__ = ()
-	__name__  = ''
-
-	@classmethod
-	@property
-	def ZERO (cls):
-		return cls(0.0)
-	
-	@classmethod
-	@property
-	def ONE (cls):
-		return cls(1.0)
-
-	def __init__ (self, *args):
-		self.set_co(0.0)
-		if len(args) == 1:
-			self.set_co(args[0])
-			args = args[0]
-		else:
-			self.set_co(*args)
-
-	def _get_i (self, index: int) -> float:
-		return getattr(self, self.__slots__[index])
-	def _set_i (self, index: int, value: float):
-		setattr(self, self.__slots__[index], value)
-	def _get_s (self, index: str) -> float:
-		return getattr(self, index)
-	def _set_s (self, index: str, value: float):
-		setattr(self, index, value)
-
-	def _swizzle (self, key: str):
-		slots = self.__slots__
-		alias = self.__alias__
-		_alias = None
-		for ch in key:
-			if ch == '_':
-				yield None
-				continue
-			if _alias is None:
-				if ch in slots:
-					_alias = slots
-				else:
-					for a in alias:
-						if ch in a:
-							_alias = a
-							break
-				if _alias is None:
-					raise KeyError(f"Couldn't determine swizzle alias for key {key}")
-			if not ch in _alias:
-				KeyError(f"Can't mix swizzle sets for {key} in {_alias}")
-			yield slots[_alias.index(ch)]
-
-	def _index_list (self, indicies: tuple):
-		for k in indicies:
-			if (k is ...) or (k is None):
-				yield None
-				continue
-			elif isinstance(k, str):
-				yield k
-			elif isinstance(k, int):
-				yield self.__slots__[k]
-
-	def __iter__ (self):
-		return (self._get_s(k) for k in self.__slots__)
-
-	def __getitem__ (self, index):
-		if isinstance(index, int):
-			return self._get_i(index)
-		elif index is ...:
-			return self.__class__(*self)
-		
-		if isinstance(index, str):
-			if len(index) == 0:
-				return self.__class__(*self)
-			genr, count = self._swizzle(index), len(index)
-			out = tuple[float](0.0 if k is None else self._get_s(k) for k in genr)
-			if count == 1:
-				return out[0]
-			elif count == 2:
-				return Co2(*out)
-			elif count == 3:
-				return Co3(*out)
-			return out
-		elif hasattr(index, '__iter__'):
-			genr = self._index_list(index)
-			out = tuple[float](0.0 if k is None else self._get_s(k) for k in genr)
-			if len(out) == 1:
-				return out[0]
-			return out
-
-	def __setitem__ (self, index, value):
-		slr = lambda: range(len(self.__slots__))
-		is_dead = lambda x: (x is None) or (x is ...)
-		if hasattr(value, '__iter__'):
-			v_genr = _unzip_input(value)
-		else:
-			v = 0.0 if is_dead(value) else value
-			v_genr = (v for _ in slr())
-		
-		if isinstance(index, int):
-			self._set_i(index, next(v_genr))
-			return
-		elif index is ...:
-			self.set_co(v_genr)
-			return
-		
-		if isinstance(index, str):
-			if len(index) == 0:
-				self.set_co(v_genr)
-				return
-			genr = self._swizzle(index)
-		elif hasattr(index, '__iter__'):
-			genr = self._index_list(index)
-		for i, v, _, in zip(genr, v_genr, range(len(self.__slots__))):
-			if i is None:
-				continue
-			self._set_s(i, v)
-
-	def __repr__ (self):
-		return f"{self.__name__}({', '.join(str(v) for v in self)})"
-
-	def set_co (self, /, *args):
-		if len(args) == 1:
-			args = args[0]
-			if not hasattr(args, '__iter__'):
-				if args is None:
-					args = 0.0
-				for k in self.__slots__:
-					self._set_s(k, args)
-				return
-		for k, v in zip(self.__slots__, _unzip_input(args)):
-			if k is None:
-				continue
-			self._set_s(k, 0.0 if v is None else v)
-
-	def length_squared (self) -> float:
-		return sum(k ** 2 for k in self)
-
-	def length (self) -> float:
-		return sqrt(self.length_squared())
-
-	def _inv_mag (self) -> float:
-		mag = self.length_squared()
-		if mag == 0.0:
-			return 0.0
-		return 1.0 / sqrt(mag)
-
-	def normalize (self):
-		'Normalizes the coord in-place'
-		mag = self._inv_mag()
-		self.set_co(k * mag for k in self)
-
-	def normalized (self):
-		mag = self._inv_mag()
-		return self.__class__(k * mag for k in self)
-
-	def dist_l1 (self, other) -> float:
-		return sum(abs(i-j) for i, j in zip(self, other))
-
-	def dot (self, other) -> float:
-		return sum(a * b for a, b in zip(self, other))
-
-	def __neg__ (self):
-		return self.__class__(-v for v in self)
-
-	def _op_uhh (self, thing):
-		if hasattr(thing, '__iter__'):
-			return zip(self, _unzip_input(thing))
-		else:
-			return zip(self, (thing for _ in range(len(self.__slots__))))
-
-	def __eq__ (self, other) -> bool:
-		other = self._op_uhh(other)
-		return all(a == b for a, b in other)
-
-	def pow (self, other) -> Self:
-		return self.__class__(a ** b for a, b in self._op_uhh(other))
-
-	def __add__ (self, other) -> Self:
-		return self.__class__(a + b for a, b in self._op_uhh(other))
-	def __radd__ (self, other) -> Self:
-		return self.__class__(b + a for a, b in self._op_uhh(other))
-
-	def __sub__ (self, other) -> Self:
-		return self.__class__(a - b for a, b in self._op_uhh(other))
-	def __rsub__ (self, other) -> Self:
-		return self.__class__(b - a for a, b in self._op_uhh(other))
-	
-	def __mul__ (self, other) -> Self:
-		return self.__class__(a * b for a, b in self._op_uhh(other))
-	def __rmul__ (self, other) -> Self:
-		return self.__class__(b * a for a, b in self._op_uhh(other))
-	
-	def __truediv__ (self, other) -> Self:
-		return self.__class__(_safe_div(a, b) for a, b in self._op_uhh(other))
-	def __rtruediv__ (self, other) -> Self:
-		return self.__class__(_safe_div(b, a) for a, b in self._op_uhh(other))
-
-
-class Co2(CoordBase):
-	__slots__ = 'x', 'y'
-	__alias__ = 'uv', 'st', 'ij'
-	__name__ = 'Co2'
-	def __init__ (self, /, *args, x = None, y = None):
-		if len(args) == 0:
-			args = (x, y)
-		super().__init__(*args)
-
-	def __le__ (a, b: Self) -> bool:
-		return _co2_leq(a.x, a.y, b.x, b.y)
-
-	def __gt__ (a, b: Self) -> bool:
-		return not _co2_leq(a.x, a.y, b.x, b.y)
-
-	@property
-	def xy (self) -> Self:
-		'Alias for `co[...]`'
-		return Co2(self.x, self.y)
-
-	@xy.setter
-	def xy (self, v):
-		self[...] = v
-
-	@property
-	def yx (self) -> Self:
-		'alias for `self` transposed'
-		return Co2(self.y, self.x)
-
-
-class Co3(CoordBase):
-	__slots__ = 'x', 'y', 'z'
-	__alias__ = 'stp', 'uvw', 'ijk', 'rgb'
-	__name__ = 'Co3'
-	def __init__ (self, /, *args, x = None, y = None, z = None):
-		if len(args) == 0:
-			args = (x, y, z)
-		super().__init__(*args)
-
-	def cross (a, b: Self):
-		return Co3(a.y*b.z - a.z*b.y,
-		           a.z*b.x - a.x*b.z,
-		           a.x*b.y - a.y*b.x)
-
-	@property
-	def xyz (self) -> Self:
-		'An alias for `co[...]`. Just for readability I suppose.'
-		return Co3(self.x, self.y, self.z)
-
-	@xyz.setter
-	def xyz (self, v):
-		self[...] = v
-
-
-class Co4(CoordBase):
-	__slots__ = 'x', 'y', 'z', 'w'
-	__alias__ = 'rgba', 'stpq', 'ijkl'
-	__name__ = 'Co4'
-	def __init__ (self, /, *args, r = None, g = None, b = None, a = None):
-		if len(args) == 0:
-			args = (r, g, b, a)
-		super().__init__(*args)
-
+from functools import lru_cache
+from itertools import repeat
+from math import sqrt
+from operator import attrgetter
+from typing import Self
+
+
+def _safe_div (a, b):
+	if b == 0.0:
+		return 0.0
+	return a / b
+
+def _unzip_input (*args):
+	if len(args) == 1 and isinstance(args[0], tuple|list):
+		args = args[0]
+	for value in args:
+		if hasattr(value, '__iter__'):
+			for v in value:
+				yield v
+			continue
+		yield value
+
+def _co2_leq (a0, a1, b0, b1) -> bool:
+	return (a0 < b0) or (a0 == b0 and a1 <= b1)
+
+@lru_cache(maxsize=1024)
+def _compile_swizzle (cls, key: str):
+	'''
+	Resolves a swizzle string once per `(cls, key)` into a `(getter, setter)`
+	pair, so `co['zyx']` doesn't have to re-scan the slots and aliases on
+	every access. Bad keys (unknown or mixed alias sets) raise here.
+	'''
+	names = tuple(CoordBase._swizzle(cls, key))
+	count = len(names)
+	if None in names:
+		gets = tuple((lambda co: 0.0) if k is None else attrgetter(k) for k in names)
+		read = lambda co: tuple(g(co) for g in gets)
+	else:
+		read = attrgetter(*names)
+
+	if count == 1:
+		getter = read if names[0] is not None else (lambda co: 0.0)
+	elif count == 2:
+		getter = lambda co: Co2(*read(co))
+	elif count == 3:
+		getter = lambda co: Co3(*read(co))
+	else:
+		getter = read
+
+	# writes never go past the coord's own arity, same as `set_co`
+	live = tuple((i, k) for i, k in enumerate(names[:len(cls.__fields__)]) if k is not None)
+	def setter (co, value):
+		if hasattr(value, '__iter__'):
+			vals = tuple(_unzip_input(value))
+			for i, k in live:
+				if i >= len(vals):
+					break
+				setattr(co, k, vals[i])
+			return
+		if (value is None) or (value is ...):
+			value = 0.0
+		for _, k in live:
+			setattr(co, k, value)
+	return getter, setter
+
+
+class CoordBase:
+	__slots__ = ()
+	__fields__ = ()
+	__alias__ = ()
+	__name__  = ''
+
+	@classmethod
+	@property
+	def ZERO (cls):
+		return cls(0.0)
+	
+	@classmethod
+	@property
+	def ONE (cls):
+		return cls(1.0)
+
+	@property
+	def _value_type (self) -> type[Self]:
+		'The class new coords are made from, views over a buffer make plain coords'
+		return self.__class__
+
+	def __init__ (self, *args):
+		self.set_co(0.0)
+		if len(args) == 1:
+			self.set_co(args[0])
+			args = args[0]
+		else:
+			self.set_co(*args)
+
+	def _get_i (self, index: int) -> float:
+		return getattr(self, self.__fields__[index])
+	def _set_i (self, index: int, value: float):
+		setattr(self, self.__fields__[index], value)
+	def _get_s (self, index: str) -> float:
+		return getattr(self, index)
+	def _set_s (self, index: str, value: float):
+		setattr(self, index, value)
+
+	def _swizzle (self, key: str):
+		slots = self.__fields__
+		alias = self.__alias__
+		_alias = None
+		for ch in key:
+			if ch == '_':
+				yield None
+				continue
+			if _alias is None:
+				if ch in slots:
+					_alias = slots
+				else:
+					for a in alias:
+						if ch in a:
+							_alias = a
+							break
+				if _alias is None:
+					raise KeyError(f"Couldn't determine swizzle alias for key {key}")
+			if not ch in _alias:
+				raise KeyError(f"Can't mix swizzle sets for {key} in {_alias}")
+			yield slots[_alias.index(ch)]
+
+	def _index_list (self, indicies: tuple):
+		for k in indicies:
+			if (k is ...) or (k is None):
+				yield None
+				continue
+			elif isinstance(k, str):
+				yield k
+			elif isinstance(k, int):
+				yield self.__fields__[k]
+
+	def __iter__ (self):
+		return (self._get_s(k) for k in self.__fields__)
+
+	def __getitem__ (self, index):
+		if isinstance(index, int):
+			return self._get_i(index)
+		elif index is ...:
+			return self._value_type(*self)
+		
+		if isinstance(index, str):
+			if len(index) == 0:
+				return self._value_type(*self)
+			return _compile_swizzle(self.__class__, index)[0](self)
+		elif hasattr(index, '__iter__'):
+			genr = self._index_list(index)
+			out = tuple[float](0.0 if k is None else self._get_s(k) for k in genr)
+			if len(out) == 1:
+				return out[0]
+			return out
+
+	def __setitem__ (self, index, value):
+		if isinstance(index, str) and len(index) != 0:
+			_compile_swizzle(self.__class__, index)[1](self, value)
+			return
+		if hasattr(value, '__iter__'):
+			v_genr = _unzip_input(value)
+		else:
+			v = 0.0 if (value is None) or (value is ...) else value
+			v_genr = repeat(v, len(self.__fields__))
+		
+		if isinstance(index, int):
+			self._set_i(index, next(v_genr))
+			return
+		elif (index is ...) or isinstance(index, str):
+			self.set_co(v_genr)
+			return
+		
+		genr = self._index_list(index)
+		for i, v, _, in zip(genr, v_genr, range(len(self.__fields__))):
+			if i is None:
+				continue
+			self._set_s(i, v)
+
+	def __repr__ (self):
+		return f"{self.__name__}({', '.join(str(v) for v in self)})"
+
+	def freeze (self):
+		'A read-only, hashable copy, IE `Co2` -> `FrozenCo2`'
+		return self._frozen(*self)
+
+	def set_co (self, /, *args):
+		if len(args) == 1:
+			args = args[0]
+			if not hasattr(args, '__iter__'):
+				if args is None:
+					args = 0.0
+				for k in self.__fields__:
+					self._set_s(k, args)
+				return
+		for k, v in zip(self.__fields__, _unzip_input(args)):
+			if k is None:
+				continue
+			self._set_s(k, 0.0 if v is None else v)
+
+	def length_squared (self) -> float:
+		return sum(k ** 2 for k in self)
+
+	def length (self) -> float:
+		return sqrt(self.length_squared())
+
+	def _inv_mag (self) -> float:
+		mag = self.length_squared()
+		if mag == 0.0:
+			return 0.0
+		return 1.0 / sqrt(mag)
+
+	def normalize (self):
+		'Normalizes the coord in-place'
+		mag = self._inv_mag()
+		self.set_co(k * mag for k in self)
+
+	def normalized (self):
+		mag = self._inv_mag()
+		return self._value_type(k * mag for k in self)
+
+	def dist_l1 (self, other) -> float:
+		return sum(abs(i-j) for i, j in zip(self, other))
+
+	def dot (self, other) -> float:
+		return sum(a * b for a, b in zip(self, other))
+
+	def __neg__ (self):
+		return self._value_type(-v for v in self)
+
+	def _op_uhh (self, thing):
+		if hasattr(thing, '__iter__'):
+			return zip(self, _unzip_input(thing))
+		else:
+			return zip(self, (thing for _ in range(len(self.__fields__))))
+
+	def __eq__ (self, other) -> bool:
+		other = self._op_uhh(other)
+		return all(a == b for a, b in other)
+
+	def pow (self, other) -> Self:
+		return self._value_type(a ** b for a, b in self._op_uhh(other))
+
+	def __add__ (self, other) -> Self:
+		return self._value_type(a + b for a, b in self._op_uhh(other))
+	def __radd__ (self, other) -> Self:
+		return self._value_type(b + a for a, b in self._op_uhh(other))
+
+	def __sub__ (self, other) -> Self:
+		return self._value_type(a - b for a, b in self._op_uhh(other))
+	def __rsub__ (self, other) -> Self:
+		return self._value_type(b - a for a, b in self._op_uhh(other))
+	
+	def __mul__ (self, other) -> Self:
+		return self._value_type(a * b for a, b in self._op_uhh(other))
+	def __rmul__ (self, other) -> Self:
+		return self._value_type(b * a for a, b in self._op_uhh(other))
+	
+	def __truediv__ (self, other) -> Self:
+		return self._value_type(_safe_div(a, b) for a, b in self._op_uhh(other))
+	def __rtruediv__ (self, other) -> Self:
+		return self._value_type(_safe_div(b, a) for a, b in self._op_uhh(other))
+
+	# in-place variants actually mutate `self`, so anything else holding a
+	# reference to this coord sees the change
+	def __iadd__ (self, other) -> Self:
+		self.set_co(tuple(a + b for a, b in self._op_uhh(other)))
+		return self
+
+	def __isub__ (self, other) -> Self:
+		self.set_co(tuple(a - b for a, b in self._op_uhh(other)))
+		return self
+
+	def __imul__ (self, other) -> Self:
+		self.set_co(tuple(a * b for a, b in self._op_uhh(other)))
+		return self
+
+	def __itruediv__ (self, other) -> Self:
+		self.set_co(tuple(_safe_div(a, b) for a, b in self._op_uhh(other)))
+		return self
+
+
+# the generic `CoordBase` operators above work for any arity and any kind of
+# operand, but pay for it with zips, generators and `_unzip_input` on every
+# call. `_specialize` writes out per-class versions that touch `self.x` etc
+# directly for the two common cases (same class or a plain scalar) and only
+# fall back to the generic versions for anything else.
+
+_SCALAR = float, int
+
+# classes that share a field layout and can take the fast paths with each
+# other, IE `Co2` and `FrozenCo2`
+_SAME: dict[tuple[str, ...], set[type]] = {}
+
+_BINOPS = {
+	'__add__':      '{a} + {b}',
+	'__radd__':     '{b} + {a}',
+	'__sub__':      '{a} - {b}',
+	'__rsub__':     '{b} - {a}',
+	'__mul__':      '{a} * {b}',
+	'__rmul__':     '{b} * {a}',
+	'__truediv__':  '0.0 if {b} == 0.0 else {a} / {b}',
+	'__rtruediv__': '0.0 if {a} == 0.0 else {b} / {a}',
+	'pow':          '{a} ** {b}',
+}
+
+_IOPS = {
+	'__iadd__':     _BINOPS['__add__'],
+	'__isub__':     _BINOPS['__sub__'],
+	'__imul__':     _BINOPS['__mul__'],
+	'__itruediv__': _BINOPS['__truediv__'],
+}
+
+_KERNELS = {
+	'add_into': _BINOPS['__add__'],
+	'sub_into': _BINOPS['__sub__'],
+	'mul_into': _BINOPS['__mul__'],
+	'div_into': _BINOPS['__truediv__'],
+}
+
+def _gen_new (fields, exprs, frozen: bool, indent: str):
+	'Lines that build and return a new `cls` from one expression per field'
+	yield f'{indent}new = _new(cls)'
+	if frozen:
+		# frozen coords block `__setattr__`, so go through the slot descriptors
+		for k, e in zip(fields, exprs):
+			yield f'{indent}_set_{k}(new, {e})'
+		yield f"{indent}_set_hash(new, _hash(({''.join(f'new.{k}, ' for k in fields)})))"
+	else:
+		for k, e in zip(fields, exprs):
+			yield f'{indent}new.{k} = {e}'
+	yield f'{indent}return new'
+
+def _gen_binop (name: str, expr: str, fields, frozen = False, cls = 'self.__class__') -> str:
+	same = (expr.format(a=f'self.{k}', b=f'other.{k}') for k in fields)
+	scal = (expr.format(a=f'self.{k}', b='other') for k in fields)
+	if frozen and name.startswith('__r'):
+		# python asks the subclass first for `Co2(...) + FrozenCo2(...)`, so
+		# hand it back to the left hand side to keep the result mutable
+		same = ('\t\treturn NotImplemented',)
+	else:
+		same = _gen_new(fields, same, frozen, '\t\t')
+	return '\n'.join((
+		f'def {name} (self, other):',
+		f'\tcls = {cls}',
+		'\tif other.__class__ in _same:',
+		*same,
+		'\tif other.__class__ in _SCALAR:',
+		*_gen_new(fields, scal, frozen, '\t\t'),
+		f'\treturn _base.{name}(self, other)',
+	))
+
+def _gen_neg (fields, frozen = False, cls = 'self.__class__') -> str:
+	return '\n'.join((
+		'def __neg__ (self):',
+		f'\tcls = {cls}',
+		*_gen_new(fields, (f'-self.{k}' for k in fields), frozen, '\t'),
+	))
+
+def _gen_iop (name: str, expr: str, fields) -> str:
+	same = (f'\t\tself.{k} = ' + expr.format(a=f'self.{k}', b=f'other.{k}') for k in fields)
+	scal = (f'\t\tself.{k} = ' + expr.format(a=f'self.{k}', b='other') for k in fields)
+	return '\n'.join((
+		f'def {name} (self, other):',
+		'\tif other.__class__ in _same:',
+		*same,
+		'\telif other.__class__ in _SCALAR:',
+		*scal,
+		'\telse:',
+		f'\t\treturn _base.{name}(self, other)',
+		'\treturn self',
+	))
+
+def _gen_kernel (name: str, expr: str, fields) -> str:
+	# `out` may be `a` or `b`, every component only reads its own index so
+	# writing straight into `out` is still fine
+	return '\n'.join((
+		f'def {name} (a, b, out):',
+		*(f'\tout.{k} = ' + expr.format(a=f'a.{k}', b=f'b.{k}') for k in fields),
+		'\treturn out',
+	))
+
+def _gen_init (fields, kwargs) -> str:
+	return '\n'.join((
+		f"def __init__ (self, /, *args, {', '.join(f'{k} = None' for k in kwargs)}):",
+		f'\tif len(args) == {len(fields)}:',
+		f"\t\t{', '.join(kwargs)}, = args",
+		'\telif len(args) != 0:',
+		'\t\treturn _init(self, *args)',
+		'\tif ' + ' and '.join(f'{k}.__class__ in _SCALAR' for k in kwargs) + ':',
+		*(f'\t\tself.{k} = {v}' for k, v in zip(fields, kwargs)),
+		'\telse:',
+		f"\t\t_init(self, {', '.join(kwargs)})",
+	))
+
+def _gen_frozen_init (fields, kwargs) -> str:
+	return '\n'.join((
+		f"def __init__ (self, /, *args, {', '.join(f'{k} = None' for k in kwargs)}):",
+		f'\tif len(args) == {len(fields)}:',
+		f"\t\t{', '.join(kwargs)}, = args",
+		'\telif len(args) != 0:',
+		f"\t\t{', '.join(kwargs)}, = _thaw(*args)",
+		'\tif not (' + ' and '.join(f'{k}.__class__ in _SCALAR' for k in kwargs) + '):',
+		f"\t\t{', '.join(kwargs)}, = _thaw({', '.join(kwargs)})",
+		*(f'\t_set_{k}(self, {v})' for k, v in zip(fields, kwargs)),
+		f"\t_set_hash(self, _hash(({''.join(f'{v}, ' for v in kwargs)})))",
+	))
+
+def _gen_rest (fields) -> str:
+	return '\n'.join((
+		'def __eq__ (self, other):',
+		'\tif other.__class__ in _same:',
+		'\t\treturn ' + ' and '.join(f'self.{k} == other.{k}' for k in fields),
+		'\tif other.__class__ in _SCALAR:',
+		'\t\treturn ' + ' and '.join(f'self.{k} == other' for k in fields),
+		'\treturn _base.__eq__(self, other)',
+		'',
+		'def dot (self, other):',
+		'\tif other.__class__ in _same:',
+		'\t\treturn ' + ' + '.join(f'self.{k} * other.{k}' for k in fields),
+		'\treturn _base.dot(self, other)',
+		'',
+		'def length_squared (self):',
+		'\treturn ' + ' + '.join(f'self.{k} * self.{k}' for k in fields),
+		'',
+		'def normalize (self):',
+		'\tmag = ' + ' + '.join(f'self.{k} * self.{k}' for k in fields),
+		'\tmag = 0.0 if mag == 0.0 else 1.0 / _sqrt(mag)',
+		*(f'\tself.{k} = self.{k} * mag' for k in fields),
+		'',
+		'def scale_into (a, s, out):',
+		*(f'\tout.{k} = a.{k} * s' for k in fields),
+		'\treturn out',
+		'',
+		'def madd_into (a, b, s, out):',
+		*(f'\tout.{k} = a.{k} + b.{k} * s' for k in fields),
+		'\treturn out',
+		'',
+		'def neg_into (a, out):',
+		*(f'\tout.{k} = -a.{k}' for k in fields),
+		'\treturn out',
+		'',
+		'def normalize_into (a, out):',
+		'\tmag = ' + ' + '.join(f'a.{k} * a.{k}' for k in fields),
+		'\tmag = 0.0 if mag == 0.0 else 1.0 / _sqrt(mag)',
+		*(f'\tout.{k} = a.{k} * mag' for k in fields),
+		'\treturn out',
+	))
+
+def _specialize (cls):
+	'''
+	Class decorator that generates arity-specialized `__init__`, arithmetic
+	and in-place operators, `__eq__`, `dot`, `length_squared` and `normalize`
+	for a fixed-size coord. The class' own `__init__` is kept around as the
+	fallback for odd inputs, and its keyword names are reused (`Co4` takes
+	`r, g, b, a`).
+
+	It also adds allocation-free static kernels that write into an existing
+	coord and return it: `add_into(a, b, out)`, `sub_into`, `mul_into`,
+	`div_into`, `scale_into(a, s, out)`, `madd_into(a, b, s, out)`
+	(`out = a + b*s`), `neg_into(a, out)` and `normalize_into(a, out)`.
+	'''
+	fields = cls.__fields__
+	kwargs = tuple(cls.__init__.__kwdefaults__)
+	src = '\n\n'.join((
+		_gen_init(fields, kwargs),
+		*(_gen_binop(name, expr, fields) for name, expr in _BINOPS.items()),
+		*(_gen_iop(name, expr, fields) for name, expr in _IOPS.items()),
+		*(_gen_kernel(name, expr, fields) for name, expr in _KERNELS.items()),
+		_gen_neg(fields),
+		_gen_rest(fields),
+	))
+	same = _SAME.setdefault(fields, set())
+	same.add(cls)
+	ns = {
+		'_new': object.__new__,
+		'_base': CoordBase,
+		'_same': same,
+		'_init': cls.__init__,
+		'_SCALAR': _SCALAR,
+		'_sqrt': sqrt,
+	}
+	exec(src, ns)
+	for name in _GENERATED:
+		fn = ns[name]
+		fn.__qualname__ = f'{cls.__name__}.{name}'
+		setattr(cls, name, fn)
+	for name in _STATIC:
+		fn = ns[name]
+		fn.__qualname__ = f'{cls.__name__}.{name}'
+		setattr(cls, name, staticmethod(fn))
+	return cls
+
+_GENERATED = (
+	'__init__', *_BINOPS, *_IOPS, '__neg__', '__eq__', 'dot', 'length_squared',
+	'normalize',
+)
+
+_STATIC = (
+	*_KERNELS, 'scale_into', 'madd_into', 'neg_into', 'normalize_into',
+)
+
+def _specialize_frozen (cls):
+	'''
+	`_specialize` for the frozen variants, which must directly follow the
+	mutable class they freeze in their bases. Construction writes through the
+	slot descriptors and fills in the precomputed hash. The in-place operators
+	are the regular ones and return a new frozen coord, the same as `+=` on a
+	tuple
+	'''
+	fields = cls.__fields__
+	kwargs = tuple(cls.__init__.__kwdefaults__)
+	src = '\n\n'.join((
+		_gen_frozen_init(fields, kwargs),
+		*(_gen_binop(name, expr, fields, frozen=True) for name, expr in _BINOPS.items()),
+		_gen_neg(fields, frozen=True),
+	))
+	thaw = cls.__mro__[1]
+	unpack = attrgetter(*fields)
+	same = _SAME.setdefault(fields, set())
+	same.add(cls)
+	ns = {
+		'_new': object.__new__,
+		'_base': CoordBase,
+		'_same': same,
+		'_thaw': lambda *args: unpack(thaw(*args)),
+		'_hash': hash,
+		'_set_hash': cls._hash.__set__,
+		'_SCALAR': _SCALAR,
+		**{f'_set_{k}': getattr(thaw, k).__set__ for k in fields},
+	}
+	exec(src, ns)
+	for name in ('__init__', *_BINOPS, '__neg__'):
+		fn = ns[name]
+		fn.__qualname__ = f'{cls.__name__}.{name}'
+		setattr(cls, name, fn)
+	for name, op in zip(_IOPS, ('__add__', '__sub__', '__mul__', '__truediv__')):
+		setattr(cls, name, ns[op])
+	cls._thawed = thaw
+	thaw._frozen = cls
+	return cls
+
+def _specialize_view (cls):
+	'''
+	`_specialize` for coords that live somewhere else (IE a buffer) and only
+	expose their fields as properties. Everything that writes in place works
+	through the properties as-is, the operators just need to build their
+	results as `cls._value_type` instead of another view
+	'''
+	fields = cls.__fields__
+	src = '\n\n'.join((
+		*(_gen_binop(name, expr, fields, cls='_value') for name, expr in _BINOPS.items()),
+		_gen_neg(fields, cls='_value'),
+	))
+	same = _SAME.setdefault(fields, set())
+	same.add(cls)
+	ns = {
+		'_new': object.__new__,
+		'_base': CoordBase,
+		'_same': same,
+		'_value': cls._value_type,
+		'_SCALAR': _SCALAR,
+	}
+	exec(src, ns)
+	for name in (*_BINOPS, '__neg__'):
+		fn = ns[name]
+		fn.__qualname__ = f'{cls.__name__}.{name}'
+		setattr(cls, name, fn)
+	return cls
+
+
+@_specialize
+class Co2(CoordBase):
+	__slots__ = 'x', 'y'
+	__fields__ = __slots__
+	__alias__ = 'uv', 'st', 'ij'
+	__name__ = 'Co2'
+	def __init__ (self, /, *args, x = None, y = None):
+		if len(args) == 0:
+			args = (x, y)
+		super().__init__(*args)
+
+	def __le__ (a, b: Self) -> bool:
+		return _co2_leq(a.x, a.y, b.x, b.y)
+
+	def __gt__ (a, b: Self) -> bool:
+		return not _co2_leq(a.x, a.y, b.x, b.y)
+
+	@property
+	def xy (self) -> Self:
+		'Alias for `co[...]`'
+		return Co2(self.x, self.y)
+
+	@xy.setter
+	def xy (self, v):
+		self[...] = v
+
+	@property
+	def yx (self) -> Self:
+		'alias for `self` transposed'
+		return Co2(self.y, self.x)
+
+
+@_specialize
+class Co3(CoordBase):
+	__slots__ = 'x', 'y', 'z'
+	__fields__ = __slots__
+	__alias__ = 'stp', 'uvw', 'ijk', 'rgb'
+	__name__ = 'Co3'
+	def __init__ (self, /, *args, x = None, y = None, z = None):
+		if len(args) == 0:
+			args = (x, y, z)
+		super().__init__(*args)
+
+	def cross (a, b: Self):
+		return Co3(a.y*b.z - a.z*b.y,
+		           a.z*b.x - a.x*b.z,
+		           a.x*b.y - a.y*b.x)
+
+	@staticmethod
+	def cross_into (a, b: Self, out: Self) -> Self:
+		'`a.cross(b)` written into `out`, which may be `a` or `b`'
+		x = a.y*b.z - a.z*b.y
+		y = a.z*b.x - a.x*b.z
+		z = a.x*b.y - a.y*b.x
+		out.x = x
+		out.y = y
+		out.z = z
+		return out
+
+	@property
+	def xyz (self) -> Self:
+		'An alias for `co[...]`. Just for readability I suppose.'
+		return Co3(self.x, self.y, self.z)
+
+	@xyz.setter
+	def xyz (self, v):
+		self[...] = v
+
+
+@_specialize
+class Co4(CoordBase):
+	__slots__ = 'x', 'y', 'z', 'w'
+	__fields__ = __slots__
+	__alias__ = 'rgba', 'stpq', 'ijkl'
+	__name__ = 'Co4'
+	def __init__ (self, /, *args, r = None, g = None, b = None, a = None):
+		if len(args) == 0:
+			args = (r, g, b, a)
+		super().__init__(*args)
+
+
+class FrozenCoord(CoordBase):
+	'''
+	Read-only, hashable coords with the hash worked out once up front, so
+	they're cheap to use as dict and set keys (IE welding vertices). Math
+	on them still works and just makes new frozen coords.
+	'''
+	__slots__ = ()
+
+	def __setattr__ (self, name, value):
+		raise AttributeError(f"{self.__name__} is frozen, can't set {name!r}")
+
+	def __delattr__ (self, name):
+		raise AttributeError(f"{self.__name__} is frozen, can't delete {name!r}")
+
+	def __hash__ (self):
+		return self._hash
+
+	def __reduce__ (self):
+		return self.__class__, tuple(self)
+
+	def freeze (self):
+		return self
+
+	def thaw (self):
+		'A mutable copy, IE `FrozenCo2` -> `Co2`'
+		return self._thawed(*self)
+
+
+@_specialize_frozen
+class FrozenCo2(Co2, FrozenCoord):
+	__slots__ = '_hash',
+	__name__ = 'FrozenCo2'
+
+
+@_specialize_frozen
+class FrozenCo3(Co3, FrozenCoord):
+	__slots__ = '_hash',
+	__name__ = 'FrozenCo3'
+
+
+@_specialize_frozen
+class FrozenCo4(Co4, FrozenCoord):
+	__slots__ = '_hash',
+	__name__ = 'FrozenCo4'
+
+
+# shared constants instead of `CoordBase.ZERO`/`ONE` building a new coord on
+# every access. `Co3.X`, `Co3.Y`, `Co3.Z` etc are the unit axes
+for _co, _frozen in ((Co2, FrozenCo2), (Co3, FrozenCo3), (Co4, FrozenCo4)):
+	_n = len(_co.__fields__)
+	_co.ZERO = _frozen(*(0.0 for _ in range(_n)))
+	_co.ONE  = _frozen(*(1.0 for _ in range(_n)))
+	for _i, _k in enumerate(_co.__fields__):
+		setattr(_co, _k.upper(), _frozen(*(float(_i == _j) for _j in range(_n))))
+del _co, _frozen, _n, _i, _k
@@ -0,0 +1,361 @@
+from array import array
+from itertools import chain, cycle, repeat
+from math import sqrt
+from operator import add, sub, mul, neg, abs as _abs, attrgetter
+from typing import Self
+from ds_coord import CoordBase, Co2, Co3, Co4, _safe_div, _unzip_input
+from ds_coord_buffer import as_doubles
+
+# all the bulk math in here is done column-wise through `map` over flat
+# `array('d')` buffers, so the per-element work happens inside the
+# interpreter's C loops instead of through `CoordBase` objects
+
+
+def _inv_mag (mag: float) -> float:
+	if mag == 0.0:
+		return 0.0
+	return 1.0 / sqrt(mag)
+
+def _zeros (count: int) -> array:
+	return array('d', bytes(8 * count))
+
+def _sum_cols (cols) -> array:
+	cols = iter(cols)
+	out = array('d', next(cols))
+	for c in cols:
+		out = array('d', map(add, out, c))
+	return out
+
+
+class CoordArray:
+	'''
+	A batch of coords stored as one flat, contiguous `array('d')`
+	(`x0, y0, x1, y1, ...`). Indexing a single row gives back a regular
+	`Co2`/`Co3`/`Co4`, everything else operates on the whole batch.
+	'''
+	__slots__ = 'data',
+	__co__: type[CoordBase] = CoordBase
+	__name__ = ''
+	_k = 0
+
+	def __init__ (self, src = None):
+		if src is None:
+			data = array('d')
+		elif isinstance(src, int):
+			data = _zeros(src * self._k)
+		elif isinstance(src, CoordArray):
+			data = array('d', src.data)
+		elif isinstance(src, array):
+			data = array('d', src)
+		elif isinstance(src, bytes|bytearray|memoryview):
+			data = array('d')
+			data.frombytes(as_doubles(src).cast('B'))
+		else:
+			data = array('d', self._flatten(src))
+		if len(data) % self._k != 0:
+			raise ValueError(f"Buffer of length {len(data)} isn't a multiple of {self._k}")
+		self.data: array = data
+
+	@classmethod
+	def _new (cls, data: array) -> Self:
+		new = cls.__new__(cls)
+		new.data = data
+		return new
+
+	@classmethod
+	def _flatten (cls, items):
+		slots = cls.__co__.__fields__
+		for co in items:
+			if isinstance(co, CoordBase):
+				for k in slots:
+					yield getattr(co, k)
+			else:
+				yield from co
+
+	@classmethod
+	def from_columns (cls, *cols) -> Self:
+		'Interleaves one sequence per component, IE `Co2Array.from_columns(xs, ys)`'
+		if len(cols) != cls._k:
+			raise ValueError(f'{cls.__name__} needs {cls._k} columns, got {len(cols)}')
+		count = len(cols[0])
+		data = _zeros(count * cls._k)
+		for i, c in enumerate(cols):
+			data[i::cls._k] = c if isinstance(c, array) else array('d', c)
+		return cls._new(data)
+
+	def col (self, index: int) -> array:
+		'A copy of a single component, IE `arr.col(0)` is every x'
+		return self.data[index::self._k]
+
+	def set_col (self, index: int, values):
+		if isinstance(values, int|float):
+			values = repeat(values, len(self))
+		self.data[index::self._k] = array('d', values)
+
+	def __len__ (self):
+		return len(self.data) // self._k
+
+	def __iter__ (self):
+		k, d, co = self._k, self.data, self.__co__
+		return (co(*d[i:i+k]) for i in range(0, len(d), k))
+
+	def __repr__ (self):
+		return f"{self.__name__}([{', '.join(repr(c) for c in self)}])"
+
+	def _row_index (self, index: int) -> int:
+		count = len(self)
+		if index < 0:
+			index += count
+		if not 0 <= index < count:
+			raise IndexError(f'{self.__name__} index out of range')
+		return index * self._k
+
+	def _swizzle_cols (self, key: str):
+		'Yields the source column index per character of `key`, `None` for `_`'
+		slots = self.__co__.__fields__
+		for name in CoordBase._swizzle(self.__co__, key):
+			yield None if name is None else slots.index(name)
+
+	def __getitem__ (self, index):
+		k, d = self._k, self.data
+		if isinstance(index, int):
+			i = self._row_index(index)
+			return self.__co__(*d[i:i+k])
+		elif isinstance(index, slice):
+			rows = range(len(self))[index]
+			if rows.step == 1:
+				return self._new(d[rows.start*k:rows.stop*k])
+			return self._new(array('d', chain.from_iterable(d[i*k:(i+1)*k] for i in rows)))
+		elif index is ...:
+			return self._new(array('d', d))
+		elif isinstance(index, str):
+			cols = tuple(self._swizzle_cols(index))
+			if len(cols) == 1:
+				return _zeros(len(self)) if cols[0] is None else self.col(cols[0])
+			out_t = _ARRAY_TYPES.get(len(cols))
+			if out_t is None:
+				raise KeyError(f"Can't swizzle {len(cols)} components into a coord array")
+			out = _zeros(len(self) * len(cols))
+			for j, c in enumerate(cols):
+				if c is not None:
+					out[j::len(cols)] = d[c::k]
+			return out_t._new(out)
+		raise TypeError(f'Invalid index type {type(index).__name__}')
+
+	def __setitem__ (self, index, value):
+		k, d = self._k, self.data
+		if isinstance(index, int):
+			i = self._row_index(index)
+			if isinstance(value, int|float):
+				value = repeat(value, k)
+			row = array('d', _unzip_input(value))
+			if len(row) != k:
+				raise ValueError(f"Can't assign {len(row)} components to a {self.__co__.__name__}")
+			d[i:i+k] = row
+			return
+		elif index is ...:
+			self.data = array('d', self._operand(value, len(d)))
+			return
+		elif isinstance(index, str):
+			cols = tuple(self._swizzle_cols(index))
+			if isinstance(value, CoordArray):
+				src = [value.data[j::value._k] for j in range(len(cols))]
+			elif isinstance(value, int|float):
+				src = [array('d', repeat(value, len(self)))] * len(cols)
+			elif len(cols) == 1:
+				src = [array('d', value)]
+			else:
+				n = len(cols)
+				flat = tuple(_unzip_input(value))
+				if len(flat) == n:
+					# a single coord, broadcast over every row
+					src = [array('d', repeat(v, len(self))) for v in flat]
+				elif len(flat) == n * len(self):
+					# one coord per row
+					src = [array('d', flat[j::n]) for j in range(n)]
+				else:
+					raise ValueError(f"Can't assign {len(flat)} components to '{index}' of {self.__name__}[{len(self)}]")
+			for c, s in zip(cols, src):
+				if c is not None:
+					d[c::k] = s
+			return
+		raise TypeError(f'Invalid index type {type(index).__name__}')
+
+	def append (self, co):
+		self.data.extend(array('d', _unzip_input(co)))
+
+	def extend (self, items):
+		if isinstance(items, CoordArray):
+			self.data.extend(items.data)
+		else:
+			self.data.extend(array('d', self._flatten(items)))
+
+	def _operand (self, other, count: int = -1):
+		'An iterable to `map` elementwise against `self.data`'
+		if isinstance(other, CoordArray):
+			if other._k != self._k or len(other.data) != len(self.data):
+				raise ValueError(f"Can't operate on {self.__name__}[{len(self)}] and {other.__name__}[{len(other)}]")
+			return other.data
+		if isinstance(other, int|float):
+			return repeat(other) if count == -1 else repeat(other, count)
+		row = tuple(_unzip_input(other))
+		if len(row) != self._k:
+			raise ValueError(f"Can't broadcast {len(row)} components over {self.__name__}")
+		return cycle(row) if count == -1 else chain.from_iterable(repeat(row, count // self._k))
+
+	def _op (self, fn, other) -> Self:
+		return self._new(array('d', map(fn, self.data, self._operand(other))))
+	def _rop (self, fn, other) -> Self:
+		return self._new(array('d', map(fn, self._operand(other), self.data)))
+
+	def __add__ (self, other) -> Self:
+		return self._op(add, other)
+	def __radd__ (self, other) -> Self:
+		return self._rop(add, other)
+
+	def __sub__ (self, other) -> Self:
+		return self._op(sub, other)
+	def __rsub__ (self, other) -> Self:
+		return self._rop(sub, other)
+
+	def __mul__ (self, other) -> Self:
+		return self._op(mul, other)
+	def __rmul__ (self, other) -> Self:
+		return self._rop(mul, other)
+
+	def __truediv__ (self, other) -> Self:
+		return self._op(_safe_div, other)
+	def __rtruediv__ (self, other) -> Self:
+		return self._rop(_safe_div, other)
+
+	def pow (self, other) -> Self:
+		return self._op(pow, other)
+
+	def __neg__ (self) -> Self:
+		return self._new(array('d', map(neg, self.data)))
+
+	def _cols_of (self, other):
+		'Per-component sequences of `other`, broadcasting scalars and single coords'
+		if isinstance(other, CoordArray):
+			self._operand(other)
+			return [other.col(i) for i in range(self._k)]
+		return [array('d', self._operand(v, len(self))) for v in self._operand(other, self._k)]
+
+	def dot (self, other) -> array:
+		'Per-row dot products'
+		a = (self.col(i) for i in range(self._k))
+		return _sum_cols(map(mul, c, o) for c, o in zip(a, self._cols_of(other)))
+
+	def dist_l1 (self, other) -> array:
+		a = (self.col(i) for i in range(self._k))
+		return _sum_cols(map(_abs, map(sub, c, o)) for c, o in zip(a, self._cols_of(other)))
+
+	def length_squared (self) -> array:
+		return _sum_cols(map(mul, c, c) for c in (self.col(i) for i in range(self._k)))
+
+	def length (self) -> array:
+		return array('d', map(sqrt, self.length_squared()))
+
+	def _inv_mags (self):
+		'`_inv_mag` per row, repeated once per component to line up with `self.data`'
+		inv = map(_inv_mag, self.length_squared())
+		return chain.from_iterable(map(repeat, inv, repeat(self._k)))
+
+	def normalize (self):
+		'Normalizes every row in-place'
+		self.data = array('d', map(mul, self.data, self._inv_mags()))
+
+	def normalized (self) -> Self:
+		return self._new(array('d', map(mul, self.data, self._inv_mags())))
+
+
+class Co2Array(CoordArray):
+	__slots__ = ()
+	__co__ = Co2
+	__name__ = 'Co2Array'
+	_k = 2
+
+	def lexsort (self) -> list[int]:
+		'See `co2_lexsort`'
+		return co2_lexsort(self)
+
+	def weld (self):
+		'See `co2_weld`'
+		return co2_weld(self)
+
+
+class Co3Array(CoordArray):
+	__slots__ = ()
+	__co__ = Co3
+	__name__ = 'Co3Array'
+	_k = 3
+
+	def cross (a, b) -> Self:
+		ax, ay, az = (a.col(i) for i in range(3))
+		bx, by, bz = a._cols_of(b)
+		return Co3Array.from_columns(
+			array('d', map(sub, map(mul, ay, bz), map(mul, az, by))),
+			array('d', map(sub, map(mul, az, bx), map(mul, ax, bz))),
+			array('d', map(sub, map(mul, ax, by), map(mul, ay, bx))),
+		)
+
+
+class Co4Array(CoordArray):
+	__slots__ = ()
+	__co__ = Co4
+	__name__ = 'Co4Array'
+	_k = 4
+
+
+_ARRAY_TYPES: dict[int, type[CoordArray]] = {
+	2: Co2Array,
+	3: Co3Array,
+	4: Co4Array,
+}
+
+
+def _co2_columns (points) -> tuple[list[float], list[float]]:
+	'xs and ys of a `Co2Array`, a flat `x0, y0, x1, y1, ...` buffer or a sequence of `Co2`s'
+	if isinstance(points, CoordArray):
+		points = points.data
+	if isinstance(points, array|bytes|bytearray|memoryview):
+		mv = as_doubles(points)
+		return mv[0::2].tolist(), mv[1::2].tolist()
+	if not isinstance(points, list|tuple):
+		points = list(points)
+	return list(map(attrgetter('x'), points)), list(map(attrgetter('y'), points))
+
+def _lexsort (xs, ys) -> list[int]:
+	order = sorted(range(len(xs)), key=ys.__getitem__)
+	order.sort(key=xs.__getitem__)
+	return order
+
+def co2_lexsort (points) -> list[int]:
+	'''
+	The permutation that sorts `points` into `_co2_leq` (sweep-line) order,
+	IE by x then y, with ties kept in their original order. This is two
+	stable sorts keyed straight off the coordinate columns, so there's no
+	python-level comparison per pair like sorting the `Co2`s themselves.
+	'''
+	return _lexsort(*_co2_columns(points))
+
+def co2_weld (points) -> tuple[Co2Array, list[int]]:
+	'''
+	Merges exactly equal vertices. Returns the unique vertices in `_co2_leq`
+	order, and a remap table where `remap[i]` is the index of input vertex
+	`i` in that unique array.
+	'''
+	xs, ys = _co2_columns(points)
+	order = _lexsort(xs, ys)
+	remap = [0] * len(xs)
+	keep = list[int]()
+	u = -1
+	px = py = None
+	for i, x, y in zip(order, map(xs.__getitem__, order), map(ys.__getitem__, order)):
+		if x != px or y != py:
+			u += 1
+			px = x
+			py = y
+			keep.append(i)
+		remap[i] = u
+	return Co2Array.from_columns(list(map(xs.__getitem__, keep)), list(map(ys.__getitem__, keep))), remap
@@ -0,0 +1,124 @@
+import sys
+from array import array
+from itertools import chain
+from operator import attrgetter
+from ds_coord import CoordBase, Co2, Co3, Co4, _specialize_view
+
+
+# `rect.py` has a copy of this and `as_doubles`, keep the two in step
+# native float64 as `memoryview.format` spells it, with or without a byte order
+_DOUBLE = frozenset(('d', '@d', '=d', '<d' if sys.byteorder == 'little' else '>d'))
+
+def as_doubles (buffer) -> memoryview:
+	'''
+	A flat float64 `memoryview` over a float64 buffer or raw bytes, no copy.
+	Any other format (`array('f')`, ints, ...) would come out as garbage
+	read as doubles, so it's a `TypeError` instead
+	'''
+	mv = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+	if mv.format in _DOUBLE:
+		return mv if mv.format == 'd' and mv.ndim == 1 else mv.cast('B').cast('d')
+	if mv.format == 'B':
+		return mv.cast('d') if mv.ndim == 1 else mv.cast('B').cast('d')
+	raise TypeError(f"expected a float64 or bytes buffer, not one of format '{mv.format}'")
+
+
+def pack (coords, out: array = None) -> array:
+	'''
+	Flattens coords into a single `array('d')` (`x0, y0, x1, y1, ...`) in
+	one go. The result already supports the buffer protocol, so
+	`memoryview(...)` and `.tobytes()` are free/one copy respectively.
+	If `out` is given the coords are appended to it instead.
+	'''
+	if out is None:
+		out = array('d')
+	it = iter(coords)
+	first = next(it, None)
+	if first is None:
+		return out
+	get = attrgetter(*first.__fields__)
+	out.extend(array('d', chain.from_iterable(map(get, chain((first,), it)))))
+	return out
+
+
+def unpack (buffer, cls: type[CoordBase] = Co2, offset: int = 0, count: int = None) -> list:
+	'''
+	Builds `count` coords of type `cls` from a float64 buffer, starting at
+	`offset` doubles in. Trailing doubles that don't make up a whole coord
+	are ignored.
+	'''
+	k = len(cls.__fields__)
+	mv = as_doubles(buffer)[offset:]
+	if count is None:
+		count = len(mv) // k
+	mv = mv[:count * k]
+	return list(map(cls, *(mv[i::k] for i in range(k))))
+
+
+def _view_prop (index: int):
+	def get (self):
+		return self._mv[self._off + index]
+	def set (self, v):
+		self._mv[self._off + index] = v
+	return property(get, set)
+
+
+class CoordView(CoordBase):
+	'''
+	A coord whose components live in someone else's buffer, starting at
+	`offset` doubles in. Reads and writes go straight to the buffer, so
+	nothing is copied, and math on views makes regular coords.
+	'''
+	__slots__ = ()
+
+	def __init__ (self, buffer, offset: int = 0):
+		mv = as_doubles(buffer)
+		if not 0 <= offset <= len(mv) - len(self.__fields__):
+			raise IndexError(f'{self.__name__} at {offset} is out of range for a buffer of {len(mv)}')
+		self._mv = mv
+		self._off = offset
+
+	@classmethod
+	def over (cls, buffer, offset: int = 0, stride: int = None, count: int = None) -> list:
+		'''
+		One view per coord in an interleaved buffer. `stride` is in doubles and
+		defaults to tightly packed, so `Co3View.over(buf, 3, 6)` walks the
+		normals of an `x y z nx ny nz` vertex layout
+		'''
+		mv = as_doubles(buffer)
+		k = len(cls.__fields__)
+		if stride is None:
+			stride = k
+		if count is None:
+			count = (len(mv) - offset - k) // stride + 1
+		return [cls(mv, offset + i * stride) for i in range(max(count, 0))]
+
+
+@_specialize_view
+class Co2View(CoordView, Co2):
+	__slots__ = '_mv', '_off'
+	__name__ = 'Co2View'
+	_value_type = Co2
+	x = _view_prop(0)
+	y = _view_prop(1)
+
+
+@_specialize_view
+class Co3View(CoordView, Co3):
+	__slots__ = '_mv', '_off'
+	__name__ = 'Co3View'
+	_value_type = Co3
+	x = _view_prop(0)
+	y = _view_prop(1)
+	z = _view_prop(2)
+
+
+@_specialize_view
+class Co4View(CoordView, Co4):
+	__slots__ = '_mv', '_off'
+	__name__ = 'Co4View'
+	_value_type = Co4
+	x = _view_prop(0)
+	y = _view_prop(1)
+	z = _view_prop(2)
+	w = _view_prop(3)
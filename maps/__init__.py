@@ -1,17 +1,23 @@
-from ds_ordered import Ordered
-
-def __main ():
-	f = Ordered[str]()
-	f.insert('haha')
-	f.insert('wow!!!')
-
-	l = f.to_list()
-	print(l)
-
-
-	s = f.search('haha').item
-	print(s)
-
-
-if __name__ == '__main__':
-	__main()
+from ds_ordered import Ordered
+from ds_ordered_skip import OrderedSkip
+
+def __main ():
+	f = Ordered[str]()
+	f.insert('haha')
+	f.insert('wow!!!')
+
+	l = f.to_list()
+	print(l)
+
+
+	s = f.search('haha').item
+	print(s)
+
+	g = OrderedSkip[int]()
+	for i in (5, 1, 4, 2, 3):
+		g.insert(i)
+	print(g.to_list(), g.search(3).item, g.min().item, g.max().item)
+
+
+if __name__ == '__main__':
+	__main()
@@ -0,0 +1,181 @@
+from random import Random
+from time import perf_counter
+from ds_ordered import Ordered
+from ds_ordered_skip import OrderedSkip
+
+# the linear list is O(n) per op, so it only gets run up to here
+LINEAR_MAX = 10**4
+
+
+def _run (cls, keys: list, probes: list) -> tuple[float, float, float]:
+	'Seconds per insert, search and delete'
+	ds = cls()
+	start = perf_counter()
+	nodes = [ds.insert(k) for k in keys]
+	insert = perf_counter() - start
+	start = perf_counter()
+	for k in probes:
+		ds.search(k)
+	search = perf_counter() - start
+	start = perf_counter()
+	for node in nodes:
+		ds.delete(node)
+	delete = perf_counter() - start
+	return insert / len(keys), search / len(probes), delete / len(nodes)
+
+def bench_backends (sizes = (10**3, 10**4, 10**5, 10**6)):
+	'`Ordered` against `OrderedSkip` with random keys'
+	rng = Random(1)
+	for n in sizes:
+		keys = [rng.random() for _ in range(n)]
+		probes = [rng.random() for _ in range(min(n, 10**5))]
+		print(f'n={n:>8}')
+		for cls in (Ordered, OrderedSkip):
+			if cls is Ordered and n > LINEAR_MAX:
+				print(f'  {cls.__name__:<12}   (skipped, quadratic)')
+				continue
+			ins, sea, dele = _run(cls, keys, probes)
+			print(f'  {cls.__name__:<12} insert {ins*1e6:9.2f} us   search {sea*1e6:9.2f} us   delete {dele*1e6:7.2f} us')
+
+def bench_build (sizes = (10**4, 10**5, 10**6)):
+	'''
+	`from_iterable`, with and without `pause_gc`, against one `insert` per
+	item, and `size()` on the result
+	'''
+	rng = Random(2)
+	for n in sizes:
+		keys = [rng.random() for _ in range(n)]
+		print(f'n={n:>8}')
+		for cls in (Ordered, OrderedSkip):
+			start = perf_counter()
+			ds = cls.from_iterable(keys)
+			bulk = perf_counter() - start
+			start = perf_counter()
+			cls.from_iterable(keys, pause_gc=True)
+			paused = perf_counter() - start
+			start = perf_counter()
+			for _ in range(1000):
+				ds.size()
+			size = (perf_counter() - start) / 1000
+			if cls is Ordered and n > LINEAR_MAX:
+				inserts = '(skipped, quadratic)'
+			else:
+				start = perf_counter()
+				ds = cls()
+				for k in keys:
+					ds.insert(k)
+				inserts = f'{(perf_counter() - start)*1e3:9.1f} ms'
+			print(f'  {cls.__name__:<12} from_iterable {bulk*1e3:9.1f} ms   gc paused {paused*1e3:9.1f} ms   inserts {inserts}   size() {size*1e9:6.0f} ns')
+
+def bench_hinted (n: int = 10**5, ops: int = 10**4):
+	'''
+	`search_from`/`insert_near` against `search`/`insert` when every key
+	lands within a few places of the last node touched, like a sweep line
+	'''
+	rng = Random(3)
+	for cls in (Ordered, OrderedSkip):
+		ds = cls.from_sorted(float(i) for i in range(n))
+		keys = list[float]()
+		k = n / 2
+		for _ in range(ops):
+			k += rng.uniform(-3.0, 3.0)
+			keys.append(k)
+		if cls is Ordered and n > LINEAR_MAX:
+			plain = '(skipped, O(n) each)'
+		else:
+			start = perf_counter()
+			for k in keys:
+				ds.search(k)
+			plain = f'{(perf_counter() - start) / ops * 1e6:9.2f} us'
+		node = ds.min()
+		cmps = 0
+		start = perf_counter()
+		for k in keys:
+			node = ds.search_from(node, k)
+			cmps += ds.last_cmps
+		hinted = (perf_counter() - start) / ops
+		print(f'{cls.__name__:<12} search {plain}   search_from {hinted*1e6:9.2f} us   {cmps/ops:6.1f} cmps/call')
+
+		node = ds.search(keys[0])
+		cmps = 0
+		start = perf_counter()
+		for k in keys:
+			node = ds.insert_near(node, k + 0.5)
+			cmps += ds.last_cmps
+		hinted = (perf_counter() - start) / ops
+		print(f'{"":<12} insert_near {hinted*1e6:9.2f} us   {cmps/ops:6.1f} cmps/call')
+
+def bench_range (n: int = 10**6, window: int = 100, queries: int = 100):
+	'Small `range` windows against copying everything out with `to_list` and bisecting'
+	from bisect import bisect_left
+	rng = Random(4)
+	ds = OrderedSkip.from_sorted(float(i) for i in range(n))
+	los = [float(rng.randrange(n - window)) for _ in range(queries)]
+	start = perf_counter()
+	for lo in los:
+		items = ds.to_list()
+		items[bisect_left(items, lo):bisect_left(items, lo + window)]
+	copied = (perf_counter() - start) / queries
+	start = perf_counter()
+	for lo in los:
+		for _ in ds.range(lo, lo + window):
+			pass
+	lazy = (perf_counter() - start) / queries
+	print(f'n={n}  {window}-item window   to_list {copied*1e3:9.3f} ms   range {lazy*1e3:9.3f} ms   x{copied/lazy:8.1f}')
+
+def bench_range_deleting (n: int = 10**5, dups: int = 4, window: int = 1000):
+	'''
+	Drains a `range` over keys repeated `dups` times, deleting each node
+	yielded along with the one after it and the two before, so the walk
+	has to find its way back through `search`. Checks every node in the
+	range turns up exactly once, yielded or deleted
+	'''
+	for cls in (Ordered, OrderedSkip):
+		ds = cls.from_sorted(float(i // dups) for i in range(n))
+		lo, hi = float(window), float(2 * window)
+		seen = set[int]()
+		start = perf_counter()
+		for node in ds.range(lo, hi):
+			assert id(node) not in seen, 'yielded twice'
+			for nb in (node.prev.prev, node.prev, node, node.next):
+				if nb is not ds.head and lo <= nb.item < hi:
+					seen.add(id(nb))
+					ds.delete(nb)
+		took = perf_counter() - start
+		assert len(seen) == window * dups, f'{window * dups - len(seen)} skipped'
+		assert len(ds) == n - window * dups
+		print(f'{cls.__name__:<12} {window}x{dups} duplicate keys   range + delete {took*1e3:7.1f} ms')
+
+def bench_merge_split (sizes = (10**4, 10**5)):
+	'`merge`/`split_at` against draining one side and `insert`ing item by item'
+	rng = Random(5)
+	for n in sizes:
+		xs = sorted(rng.random() for _ in range(n))
+		ys = sorted(rng.random() for _ in range(n))
+		for cls in (Ordered, OrderedSkip):
+			a, b = cls.from_sorted(xs), cls.from_sorted(ys)
+			start = perf_counter()
+			a.merge(b)
+			merge = perf_counter() - start
+			start = perf_counter()
+			a.split_at(0.5)
+			split = perf_counter() - start
+			if cls is Ordered and n > LINEAR_MAX:
+				slow = '(skipped, quadratic)'
+			else:
+				a, b = cls.from_sorted(xs), cls.from_sorted(ys)
+				start = perf_counter()
+				for node in list(b.nodes()):
+					b.delete(node)
+					a.insert(node.item)
+				slow = f'{(perf_counter() - start)*1e3:9.1f} ms'
+			print(f'n={n:>7} {cls.__name__:<12} merge {merge*1e3:7.1f} ms   split_at {split*1e3:7.1f} ms   reinsert {slow}')
+
+
+if __name__ == '__main__':
+	bench_backends()
+	bench_build()
+	bench_hinted()
+	bench_range()
+	bench_range_deleting()
+	bench_merge_split()
@@ -1,73 +1,388 @@
-from typing import TypeVar, Generic
-
-T = TypeVar('T')
-S = TypeVar('S')
-
-class Ordered(Generic[T]):
-	__slots__ = 'head', 'cmp'
-	class Node(Generic[S]):
-		__slots__ = 'prev', 'next', 'item'
-		def __init__ (self, item: S = None):
-			self.prev = self.next = self
-			self.item: S = item
-		
-		def delete (self):
-			self.prev.next = self.next
-			self.next.prev = self.prev
-			self.next = self.prev = self
-
-	def _new_node (self, itm = None):
-		return self.Node[T](itm)
-
-	def __init__ (self, cmp = None):
-		if cmp is None:
-			cmp = lambda a, b: a <= b
-		self.cmp = cmp
-		self.head = self._new_node()
-
-	def insert_before (ds, node: Node[T], item: T) -> Node[T]:
-		while True:
-			if ((node:=node.prev).item is None) or ds.cmp(node.item, item):
-				break
-		new = ds._new_node(item)
-		new.next = node.next
-		new.prev = node
-		node.next.prev = new
-		node.next = new
-		return new
-
-	def delete (ds, node: Node[T]):
-		node.next.prev = node.prev
-		node.prev.next = node.next
-		del node
-
-	def search (ds, item: T) -> Node[T]:
-		node = ds.head
-		while True:
-			if ((node:=node.next).item is None) or ds.cmp(item, node.item):
-				break
-		return node
-
-	def insert (ds, item: T):
-		return ds.insert_before(ds.head, item)
-
-	def to_list (ds):
-		outl = list[T]()
-		start = node = ds.head
-		while (node:=node.next) is not start:
-			outl.append(node.item)
-		return outl
-
-	def size (ds):
-		outc = 0
-		start = node = ds.head
-		while (node:=node.next) is not start:
-			outc += 1
-		return outc
-
-	def min (ds) -> Node[T]:
-		return ds.head.next
-
-	def max (ds) -> Node[T]:
-		return ds.head.prev
-
+import gc
+from contextlib import contextmanager
+from functools import cmp_to_key
+from operator import le
+from typing import TypeVar, Generic, Iterable, Iterator, Self
+
+T = TypeVar('T')
+S = TypeVar('S')
+
+@contextmanager
+def _gc_paused (pause: bool = True):
+	'''
+	Every node is a new tracked container, so bulk builds otherwise set off
+	the cycle collector over and over while none of it is garbage. This
+	turns the collector off for the whole process, not just the caller
+	'''
+	if not pause:
+		yield
+		return
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		yield
+	finally:
+		if enabled:
+			gc.enable()
+
+
+class Ordered(Generic[T]):
+	__slots__ = 'head', 'cmp', 'count', 'last_cmps'
+	class Node(Generic[S]):
+		__slots__ = 'prev', 'next', 'item', 'owner'
+		def __init__ (self, item: S = None):
+			self.prev = self.next = self
+			self.item: S = item
+			# the `Ordered` this is linked into, so deleting through the node
+			# still keeps the count right
+			self.owner = None
+		
+		def delete (self):
+			if self.owner is not None:
+				self.owner.count -= 1
+				self.owner = None
+			self.prev.next = self.next
+			self.next.prev = self.prev
+			self.next = self.prev = self
+
+	def _new_node (self, itm = None):
+		return self.Node(itm)
+
+	def __init__ (self, cmp = None):
+		if cmp is None:
+			# one shared default, so `merge` can tell two default orders apart
+			# from two different ones
+			cmp = le
+		self.cmp = cmp
+		self.head = self._new_node()
+		self.count = 0
+		# how many times `cmp` got called by the last `search_from` or
+		# `insert_near`, to check how local the hints really are
+		self.last_cmps = 0
+
+	@classmethod
+	def from_sorted (cls, items: Iterable[T], cmp = None, pause_gc: bool = False) -> Self:
+		'''
+		Builds from items already in `cmp` order in O(n), by appending each at
+		the tail rather than scanning for its place. The order isn't checked.
+		`pause_gc` keeps the cycle collector off during the build, about twice
+		as fast for big loads. It's process-wide though, and another thread
+		could turn it back on halfway or find it off, so only set it where
+		nothing else runs at the same time
+		'''
+		ds = cls(cmp)
+		with _gc_paused(pause_gc):
+			ds._extend_sorted(items)
+		return ds
+
+	@classmethod
+	def from_iterable (cls, items: Iterable[T], presorted: bool = False, cmp = None, pause_gc: bool = False) -> Self:
+		'''
+		`from_sorted` after one stable sort, so equal items keep the order
+		repeated `insert`s would have given them
+		'''
+		if not presorted:
+			if cmp is None:
+				items = sorted(items)
+			else:
+				def three_way (a, b):
+					if not cmp(b, a):
+						return -1
+					return 0 if cmp(a, b) else 1
+				items = sorted(items, key=cmp_to_key(three_way))
+		return cls.from_sorted(items, cmp, pause_gc)
+
+	def _extend_sorted (ds, items: Iterable[T]):
+		ds._append_nodes(map(ds._new_node, items))
+
+	def _append_nodes (ds, nodes: Iterable[Node[T]]):
+		'Links `nodes` on at the tail in order, taking them over from wherever they were'
+		head = ds.head
+		last = head.prev
+		n = 0
+		for node in nodes:
+			node.owner = ds
+			node.prev = last
+			last.next = node
+			last = node
+			n += 1
+		last.next = head
+		head.prev = last
+		ds.count += n
+
+	def _chain (ds, node: Node[T]) -> Iterator[Node[T]]:
+		'The nodes from `node` to the end, safe to relink as they come'
+		head = ds.head
+		while node is not head:
+			nxt = node.next
+			yield node
+			node = nxt
+
+	def _reset_head (ds):
+		ds.head.next = ds.head.prev = ds.head
+		ds.count = 0
+
+	def _cut_before (ds, node: Node[T]):
+		'Ends the list just before `node`, leaving `node` onwards dangling'
+		last = node.prev
+		last.next = ds.head
+		ds.head.prev = last
+
+	def _insert_after (ds, pred: Node[T], item: T) -> Node[T]:
+		new = ds._new_node(item)
+		new.owner = ds
+		ds.count += 1
+		return ds._link_after(pred, new)
+
+	def _link_after (ds, pred: Node[T], new: Node[T]) -> Node[T]:
+		new.next = pred.next
+		new.prev = pred
+		pred.next.prev = new
+		pred.next = new
+		return new
+
+	def insert_before (ds, node: Node[T], item: T) -> Node[T]:
+		while True:
+			if ((node:=node.prev).item is None) or ds.cmp(node.item, item):
+				break
+		return ds._insert_after(node, item)
+
+	def _pred (ds, item: T) -> Node[T]:
+		'The last node `n` with `cmp(n.item, item)`, or `head`'
+		node = ds.head
+		while True:
+			if ((node:=node.prev).item is None) or ds.cmp(node.item, item):
+				return node
+
+	def delete (ds, node: Node[T]):
+		if node.owner is ds:
+			ds.count -= 1
+			node.owner = None
+		node.next.prev = node.prev
+		node.prev.next = node.next
+		del node
+
+	def search (ds, item: T) -> Node[T]:
+		node = ds.head
+		while True:
+			if ((node:=node.next).item is None) or ds.cmp(item, node.item):
+				break
+		return node
+
+	def insert (ds, item: T):
+		return ds.insert_before(ds.head, item)
+
+	def _walk_search (ds, node: Node[T], item: T, limit: int = -1) -> tuple[Node[T] | None, int]:
+		'''
+		`search` by walking out from `node` in whichever direction `item` lies.
+		Gives `(found, comparisons)`, with `found` as `None` if it gave up
+		after `limit` comparisons
+		'''
+		cmp = ds.cmp
+		n = 0
+		if node.item is not None:
+			n += 1
+			if cmp(item, node.item):
+				while (pv:=node.prev).item is not None:
+					if n == limit:
+						return None, n
+					n += 1
+					if not cmp(item, pv.item):
+						break
+					node = pv
+				return node, n
+		while (nx:=node.next).item is not None:
+			if n == limit:
+				return None, n
+			n += 1
+			if cmp(item, nx.item):
+				break
+			node = nx
+		return nx, n
+
+	def _walk_pred (ds, node: Node[T], item: T, limit: int = -1) -> tuple[Node[T] | None, int]:
+		'Same as `_walk_search`, for the node `insert` would put `item` after'
+		cmp = ds.cmp
+		n = 0
+		if node.item is not None:
+			n += 1
+			if not cmp(node.item, item):
+				while (node:=node.prev).item is not None:
+					if n == limit:
+						return None, n
+					n += 1
+					if cmp(node.item, item):
+						break
+				return node, n
+		while (nx:=node.next).item is not None:
+			if n == limit:
+				return None, n
+			n += 1
+			if not cmp(nx.item, item):
+				break
+			node = nx
+		return node, n
+
+	def search_from (ds, node: Node[T], item: T) -> Node[T]:
+		'''
+		`search`, but walking outwards from `node` instead of from the head, so
+		it takes time in proportion to how far the result is from `node`
+		'''
+		found, ds.last_cmps = ds._walk_search(node, item)
+		return found
+
+	def insert_near (ds, node: Node[T], item: T) -> Node[T]:
+		'''
+		`insert`, but finding the spot by walking outwards from `node`. Unlike
+		`insert_before`, `item` can end up on either side of `node`
+		'''
+		pred, ds.last_cmps = ds._walk_pred(node, item)
+		return ds._insert_after(pred, item)
+
+	def _walk_forward (ds, node: Node[T], hi: T = None) -> Iterator[Node[T]]:
+		head, cmp = ds.head, ds.cmp
+		while node is not head:
+			if hi is not None and cmp(hi, node.item):
+				return
+			# what's around `node` now, the walk is already past `prv` and
+			# nothing's between them
+			nxt, prv = node.next, node.prev
+			pprv = prv.prev
+			yield node
+			# the caller may have deleted `node` (or more) in the meantime, so
+			# carry on from whatever is still linked
+			if node.owner is ds:
+				node = node.next
+			elif nxt is head or nxt.owner is ds:
+				node = nxt
+			elif prv is head or prv.owner is ds:
+				node = prv.next
+			elif pprv is head or pprv.owner is ds:
+				node = pprv.next
+			else:
+				# the first node not less than `node.item`, so none left equal
+				# to it get skipped
+				node = ds.search(node.item)
+
+	def _walk_backward (ds, node: Node[T]) -> Iterator[Node[T]]:
+		head = ds.head
+		while node is not head:
+			prv, nxt = node.prev, node.next
+			nnxt = nxt.next
+			yield node
+			if node.owner is ds:
+				node = node.prev
+			elif prv is head or prv.owner is ds:
+				node = prv
+			elif nxt is head or nxt.owner is ds:
+				node = nxt.prev
+			elif nnxt is head or nnxt.owner is ds:
+				node = nnxt.prev
+			else:
+				# the last node not greater than `node.item`
+				node = ds._pred(node.item)
+
+	def nodes (ds, start: Node[T] = None) -> Iterator[Node[T]]:
+		'''
+		Lazily yields the nodes from `start` (`min()` by default) up to the max.
+		Deleting nodes mid-iteration is fine, including the one just yielded
+		and the ones either side of it. Nothing still linked gets skipped, but
+		if more than that goes at once the walk may `search` its way back in,
+		and come back to items equal to the deleted one that it already gave
+		'''
+		return ds._walk_forward(ds.head.next if start is None else start)
+
+	def nodes_reversed (ds, start: Node[T] = None) -> Iterator[Node[T]]:
+		'Same as `nodes`, but from `start` (`max()` by default) down to the min'
+		return ds._walk_backward(ds.head.prev if start is None else start)
+
+	def range (ds, lo: T, hi: T) -> Iterator[Node[T]]:
+		'''
+		Lazily yields the nodes with `lo <= item < hi` by `cmp`. Finding the
+		first one is a `search`, so it's O(log n) on `OrderedSkip`
+		'''
+		return ds._walk_forward(ds.search(lo), hi)
+
+	def __iter__ (ds) -> Iterator[T]:
+		return (node.item for node in ds.nodes())
+
+	def __reversed__ (ds) -> Iterator[T]:
+		return (node.item for node in ds.nodes_reversed())
+
+	def merge (ds, other: Self):
+		'''
+		Moves every node out of `other` and into this in one linear merge by
+		`cmp`, leaving `other` empty. On ties this side's items come first,
+		same as `insert`ing `other`'s one by one. The nodes themselves are
+		moved, so handles to them stay valid and just belong to this now.
+		Both have to be the same kind with the same `cmp`, or the result
+		wouldn't be in any one order
+		'''
+		assert type(other) is type(ds), f"can't merge a {type(other).__name__} into a {type(ds).__name__}"
+		assert other.cmp is ds.cmp, "can't merge two different orders"
+		if other is ds or other.count == 0:
+			return
+		cmp = ds.cmp
+		# `from_sorted` takes the order on trust, so at least both ends of
+		# each side have to agree with it before anything moves
+		for side in (ds, other):
+			assert side.count == 0 or cmp(side.head.next.item, side.head.prev.item), 'merging an unsorted side'
+		a, b = ds.head.next, other.head.next
+		ha, hb = ds.head, other.head
+		ds._reset_head()
+		other._reset_head()
+		def merged ():
+			nonlocal a, b
+			while a is not ha and b is not hb:
+				if cmp(a.item, b.item):
+					nxt = a.next
+					yield a
+					a = nxt
+				else:
+					nxt = b.next
+					yield b
+					b = nxt
+			while a is not ha:
+				nxt = a.next
+				yield a
+				a = nxt
+			while b is not hb:
+				nxt = b.next
+				yield b
+				b = nxt
+		ds._append_nodes(merged())
+
+	def split_at (ds, item: T) -> Self:
+		'''
+		Moves every node with `item <= node.item` by `cmp` into a new
+		`Ordered` of the same kind, and returns that. Like `merge` the nodes
+		themselves move, so handles stay valid
+		'''
+		new = ds.__class__(ds.cmp)
+		first = ds.search(item)
+		if first is ds.head:
+			return new
+		ds._cut_before(first)
+		new._append_nodes(ds._chain(first))
+		ds.count -= new.count
+		return new
+
+	def to_list (ds):
+		outl = list[T]()
+		start = node = ds.head
+		while (node:=node.next) is not start:
+			outl.append(node.item)
+		return outl
+
+	def size (ds):
+		return ds.count
+
+	def __len__ (ds):
+		return ds.count
+
+	def min (ds) -> Node[T]:
+		return ds.head.next
+
+	def max (ds) -> Node[T]:
+		return ds.head.prev
+
@@ -0,0 +1,182 @@
+from random import getrandbits
+from typing import TypeVar
+from ds_ordered import Ordered
+
+T = TypeVar('T')
+
+# each level holds roughly a quarter of the nodes of the one below it, so
+# 16 levels is plenty for anything that fits in memory
+MAX_LEVEL = 16
+
+
+def _random_height () -> int:
+	bits = getrandbits(2 * (MAX_LEVEL - 1)) | (1 << 2 * (MAX_LEVEL - 1))
+	return ((bits & -bits).bit_length() - 1) // 2 + 1
+
+
+class OrderedSkip(Ordered[T]):
+	'''
+	A drop-in `Ordered` backed by a skip list. Level 0 is still the plain
+	`prev`/`next` ring through `head`, so walking nodes works exactly the
+	same, but `search` and out-of-place `insert_before`s go down the upper
+	levels in O(log n) instead of scanning the whole list.
+	'''
+	__slots__ = 'height',
+
+	class Node(Ordered.Node):
+		# `nexts[i]`/`prevs[i]` are the neighbours on level `i + 1`
+		__slots__ = 'nexts', 'prevs'
+		def __init__ (self, item = None, height: int = 1):
+			super().__init__(item)
+			self.nexts = [self] * (height - 1)
+			self.prevs = [self] * (height - 1)
+
+		def delete (self):
+			for lvl in range(len(self.nexts)):
+				nx, pv = self.nexts[lvl], self.prevs[lvl]
+				pv.nexts[lvl] = nx
+				nx.prevs[lvl] = pv
+				self.nexts[lvl] = self.prevs[lvl] = self
+			super().delete()
+
+	def _new_node (self, itm = None):
+		if itm is None:
+			return self.Node(None, MAX_LEVEL)
+		return self.Node(itm, _random_height())
+
+	def __init__ (self, cmp = None):
+		super().__init__(cmp)
+		self.height = 1
+
+	def _pred (ds, item: T, cmp = None) -> Node:
+		'The last node `n` with `cmp(n.item, item)`, or `head`'
+		head = ds.head
+		if cmp is None:
+			cmp = ds.cmp
+		node = head
+		for lvl in range(ds.height - 2, -1, -1):
+			while (nx:=node.nexts[lvl]) is not head and cmp(nx.item, item):
+				node = nx
+		while (nx:=node.next) is not head and cmp(nx.item, item):
+			node = nx
+		return node
+
+	def _link_after (ds, pred: Node, new: Node):
+		new.next = pred.next
+		new.prev = pred
+		pred.next.prev = new
+		pred.next = new
+		# the upper levels' predecessors are the closest tall enough nodes to
+		# the left, a few steps back per level on average
+		for lvl in range(len(new.nexts)):
+			while pred is not ds.head and len(pred.nexts) <= lvl:
+				pred = pred.prevs[lvl - 1] if lvl > 0 else pred.prev
+			nx = pred.nexts[lvl]
+			new.nexts[lvl] = nx
+			new.prevs[lvl] = pred
+			nx.prevs[lvl] = new
+			pred.nexts[lvl] = new
+		if len(new.nexts) >= ds.height:
+			ds.height = len(new.nexts) + 1
+		return new
+
+	def insert_before (ds, node: Node, item: T) -> Node:
+		pred = node.prev
+		if pred is not ds.head and not ds.cmp(pred.item, item):
+			# `item` belongs somewhere further back, where a linear scan
+			# from `node` would stop too
+			pred = ds._pred(item)
+		return ds._insert_after(pred, item)
+
+	def _append_nodes (ds, nodes):
+		# appending at the tail, so the predecessor on every level is just
+		# the current last node there. moved nodes keep their heights
+		head = ds.head
+		n = 0
+		for node in nodes:
+			node.owner = ds
+			last = head.prev
+			node.prev = last
+			node.next = head
+			last.next = head.prev = node
+			for lvl in range(len(node.nexts)):
+				last = head.prevs[lvl]
+				node.prevs[lvl] = last
+				node.nexts[lvl] = head
+				last.nexts[lvl] = head.prevs[lvl] = node
+			if len(node.nexts) >= ds.height:
+				ds.height = len(node.nexts) + 1
+			n += 1
+		ds.count += n
+
+	def _reset_head (ds):
+		super()._reset_head()
+		head = ds.head
+		head.nexts = [head] * (MAX_LEVEL - 1)
+		head.prevs = [head] * (MAX_LEVEL - 1)
+		ds.height = 1
+
+	def _cut_before (ds, node: Node):
+		head = ds.head
+		last = node.prev
+		super()._cut_before(node)
+		# same walk back as `_link_after` for the last node on each level
+		for lvl in range(ds.height - 1):
+			while last is not head and len(last.nexts) <= lvl:
+				last = last.prevs[lvl - 1] if lvl > 0 else last.prev
+			last.nexts[lvl] = head
+			head.prevs[lvl] = last
+
+	def delete (ds, node: Node):
+		# like `Ordered.delete`, only a node of this list comes off it and
+		# counts, one from another list or already deleted is left alone
+		if node.owner is ds:
+			node.delete()
+
+	def search (ds, item: T) -> Node:
+		return ds._succ(item)
+
+	def _succ (ds, item: T, cmp = None) -> Node:
+		head = ds.head
+		if cmp is None:
+			cmp = ds.cmp
+		node = head
+		for lvl in range(ds.height - 2, -1, -1):
+			while (nx:=node.nexts[lvl]) is not head and not cmp(item, nx.item):
+				node = nx
+		while (nx:=node.next) is not head and not cmp(item, nx.item):
+			node = nx
+		return node.next
+
+	def _counting_cmp (ds):
+		'`ds.cmp` plus a running count of its calls, for the fallback searches'
+		cmp = ds.cmp
+		calls = [0]
+		def counted (a, b):
+			calls[0] += 1
+			return cmp(a, b)
+		return counted, calls
+
+	def search_from (ds, node: Node, item: T) -> Node:
+		'''
+		Walks out from `node` like `Ordered.search_from`, but only for about
+		as many steps as a search from the top would take before doing that
+		instead, so a bad hint costs O(log n) rather than O(n)
+		'''
+		found, n = ds._walk_search(node, item, 2 * ds.height)
+		if found is None:
+			cmp, calls = ds._counting_cmp()
+			found = ds._succ(item, cmp)
+			n += calls[0]
+		ds.last_cmps = n
+		return found
+
+	def insert_near (ds, node: Node, item: T) -> Node:
+		'See `search_from`'
+		pred, n = ds._walk_pred(node, item, 2 * ds.height)
+		if pred is None:
+			cmp, calls = ds._counting_cmp()
+			pred = ds._pred(item, cmp)
+			n += calls[0]
+		ds.last_cmps = n
+		return ds._insert_after(pred, item)
@@ -1,9 +1,11 @@
-from ds_priority import Priority
-from ds_heap import Heap
-
-def _main ():
-	...
-
-if __name__ == '__main__':
-	_main()
-
+from ds_priority import Priority
+from ds_heap import Heap
+from ds_concurrent import ConcurrentPriority, AsyncPriority
+from ds_external import ExternalPriority
+
+def _main ():
+	...
+
+if __name__ == '__main__':
+	_main()
+
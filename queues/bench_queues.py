@@ -0,0 +1,521 @@
+import asyncio
+import marshal
+import pickle
+from random import Random
+from threading import Lock, Thread
+from time import perf_counter, sleep
+from tracemalloc import start as trace_start, stop as trace_stop, get_traced_memory
+from typing import TypeVar, Generic
+from ds_heap import Heap, DEFAULT_SIZE
+from ds_priority import Priority
+from ds_concurrent import ConcurrentPriority, AsyncPriority
+from ds_external import ExternalPriority
+
+T = TypeVar('T')
+S = TypeVar('S')
+
+
+class HandleHeap(Generic[T]):
+	'The `HandleElem` based `Heap` that `ds_heap.Heap` replaced, kept as a baseline'
+	class HandleElem(Generic[S]):
+		__slots__ = 'node', 'item'
+		def __init__ (self, item: S = None, node: int = 0):
+			self.item = item
+			self.node = node
+	
+	def __init__ (self, size = DEFAULT_SIZE, cmp = None):
+		if cmp is None:
+			cmp = lambda a, b: a <= b
+		
+		self.size = 0
+		self.size_max = size
+		self.free_list = 0
+		self.initialized = False
+		self.cmp = cmp
+
+		self.handles = self._realloc_handles(size, setatr=False)
+		self.nodes   = self._realloc_nodes(size, setatr=False)
+		self.nodes[1] = 1
+
+	def _thethree (self):
+		return self.nodes, self.handles, self.cmp
+
+	def _realloc_nodes (self, size: int = -1, setatr = True):
+		size = (self.size_max if size == -1 else size) + 1
+		newn = [-1] * (size + 1)
+		if setatr:
+			newn[:len(self.nodes)] = self.nodes
+		self.nodes = newn
+		return newn
+
+	def _realloc_handles (self, size: int = -1, setatr = True) -> list[HandleElem[T]]:
+		size = (self.size_max if size == -1 else size) + 1
+		newn = [self.HandleElem[T]() for _ in range(size + 1)]
+		if setatr:
+			newn[:len(self.handles)] = self.handles
+		self.handles = newn
+		return newn
+
+	def float_down (ds, cur: int):
+		n, h, cmp = ds._thethree()
+		h_cur = n[cur]
+		while True:
+			child = cur << 1
+			if child < ds.size and cmp(h[n[child+1]].item, h[n[child]].item):
+				child += 1
+			assert child <= ds.size_max
+			h_child = n[child]
+			if child > ds.size or cmp(h[h_cur].item, h[h_child].item):
+				n[cur] = h_cur
+				h[h_cur].node = cur
+				break
+			n[cur] = h_child
+			h[h_child].node = cur
+			cur = child
+
+	def float_up (ds, cur: int):
+		n, h, cmp = ds._thethree()
+		h_cur = n[cur]
+		while True:
+			parent = cur >> 1
+			h_parent = n[parent]
+			if parent == 0 or cmp(h[h_parent].item, h[h_cur].item):
+				n[cur] = h_cur
+				h[h_cur].node = cur
+				break
+			n[cur] = h_parent
+			h[h_parent].node = cur
+			cur = parent
+
+	def init (ds):
+		for i in range(ds.size, 0, -1):
+			ds.float_down(i)
+		ds.initialized = True
+
+	def insert (ds, new_item: T):
+		ds.size += 1
+		cur = ds.size
+		if (cur << 1) > ds.size_max:
+			ds.size_max <<= 1
+			ds._realloc_handles()
+			ds._realloc_nodes()
+		if ds.free_list == 0:
+			free = cur
+		else:
+			free = ds.free_list
+			ds.free_list = ds.handles[free].node
+		ds.nodes[cur] = free
+		hh = ds.handles[free]
+		hh.node = cur
+		hh.item = new_item
+		if ds.initialized:
+			ds.float_up(cur)
+		return free
+
+	def extract_min (ds) -> T:
+		n, h, _ = ds._thethree()
+		h_min = n[1]
+		min_v = h[h_min].item
+		if ds.size > 0:
+			n[1] = n[ds.size]
+			h[n[1]].node = 1
+			h[h_min].item = None
+			h[h_min].node = ds.free_list
+			ds.free_list = h_min
+			ds.size -= 1
+			if ds.size > 0:
+				ds.float_down(1)
+		return min_v
+
+	def delete (ds, h_cur: int):
+		n, h, cmp = ds._thethree()
+		assert (1 <= h_cur <= ds.size_max) and (h[h_cur].item is not None)
+		cur = h[h_cur].node
+		n[cur] = n[ds.size]
+		h[n[cur]].node = cur
+		ds.size -= 1
+		if cur <= ds.size:
+			if cur <= 1 or cmp(h[n[cur>>1]].item, h[n[cur]].item):
+				ds.float_down(cur)
+			else:
+				ds.float_up(cur)
+		h[h_cur].item = None
+		h[h_cur].node = ds.free_list
+		ds.free_list = h_cur
+
+	def is_empty (ds):
+		return ds.size == 0
+
+	def min (ds) -> T:
+		return ds.handles[ds.nodes[1]].item
+
+	def __len__ (ds):
+		return ds.size
+	
+	def __delitem__ (ds, h_cur: int):
+		ds.delete(h_cur)
+
+
+def _time (fn) -> float:
+	start = perf_counter()
+	fn()
+	return perf_counter() - start
+
+def _fill_drain (cls, keys: list):
+	ds = cls()
+	ds.init()
+	for k in keys:
+		ds.insert(k)
+	while not ds.is_empty():
+		ds.extract_min()
+
+def _hold (cls, keys: list):
+	'''
+	The classic event-queue "hold" model: a thousand pending entries, each
+	step pops the earliest and schedules a new one after it
+	'''
+	ds = cls()
+	ds.init()
+	for k in keys[:1000]:
+		ds.insert(k)
+	for k in keys:
+		ds.insert(ds.extract_min() + k)
+
+def _delete (cls, keys: list, order: list):
+	ds = cls()
+	ds.init()
+	handles = [ds.insert(k) for k in keys]
+	for i in order:
+		ds.delete(handles[i])
+
+def bench_heap_storage (sizes = (10**4, 10**5, 10**6)):
+	'Parallel-list `Heap` against the old `HandleElem` based one'
+	rng = Random(1)
+	for n in sizes:
+		keys = [rng.random() for _ in range(n)]
+		order = list(range(n))
+		rng.shuffle(order)
+		print(f'n={n:>8}')
+		cases = (
+			('insert+extract', lambda cls: _fill_drain(cls, keys)),
+			('hold',           lambda cls: _hold(cls, keys)),
+			('insert+delete',  lambda cls: _delete(cls, keys, order)),
+		)
+		for name, work in cases:
+			old = _time(lambda: work(HandleHeap))
+			new = _time(lambda: work(Heap))
+			print(f'  {name:<16} HandleHeap {old*1e9/n:8.1f} ns/item   Heap {new*1e9/n:8.1f} ns/item   x{old/new:5.2f}')
+
+def _reprioritize (ds, handles: list, picks: list, factors: list, in_place: bool):
+	for j, f in zip(picks, factors):
+		h = handles[j]
+		if in_place:
+			handles[j] = ds.update(h, _item(ds, h) * f)
+		else:
+			new = _item(ds, h) * f
+			ds.delete(h)
+			handles[j] = ds.insert(new)
+
+def _item (ds, h: int):
+	if isinstance(ds, Priority):
+		return ds.heap.items[h] if h >= 0 else ds.items[-(h + 1)]
+	return ds.items[h]
+
+def bench_update (n: int = 10**5, ops: int = 10**5):
+	'''
+	Re-prioritizing with `update` against `delete` then `insert`, on a
+	`Heap` and on a `Priority` whose entries start presorted. "decrease"
+	moves items well past their neighbours, "nudge" barely moves them
+	'''
+	rng = Random(2)
+	keys = [rng.random() for _ in range(n)]
+	picks = [rng.randrange(n) for _ in range(ops)]
+	for name, lo in (('decrease', 0.9), ('nudge', 1.0 - 1e-12)):
+		factors = [rng.uniform(lo, 1.0) for _ in range(ops)]
+		for cls in (Heap, Priority):
+			timings = list[float]()
+			for in_place in (False, True):
+				ds = cls()
+				handles = [ds.insert(k) for k in keys]
+				ds.init()
+				timings.append(_time(lambda: _reprioritize(ds, handles, picks, factors, in_place)))
+			print(f'{name:<9} {cls.__name__:<10} delete+insert {timings[0]*1e9/ops:8.1f} ns   update {timings[1]*1e9/ops:8.1f} ns   x{timings[0]/timings[1]:5.2f}')
+
+def bench_key_mode (sizes = (10**4, 10**5, 10**6)):
+	'''
+	`key=` against the equivalent `cmp=`, for the initial sort of a
+	`Priority` and then draining it (items are `(priority, payload)` pairs)
+	'''
+	from operator import itemgetter
+	rng = Random(3)
+	for n in sizes:
+		items = [(rng.random(), i) for i in range(n)]
+		modes = (
+			('cmp', dict(cmp=lambda a, b: a[0] <= b[0])),
+			('key', dict(key=itemgetter(0))),
+		)
+		for name, kw in modes:
+			ds = Priority(**kw)
+			for it in items:
+				ds.insert(it)
+			init = _time(ds.init)
+			for it in items[:n // 2]:
+				ds.insert((it[0] * 0.5, it[1]))
+			drain = _time(lambda: [ds.extract_min() for _ in range(n + n // 2)])
+			print(f'n={n:>8} {name}  init {init*1e3:9.1f} ms   insert half again + drain {drain*1e3:9.1f} ms')
+
+def bench_insert_many (n: int = 10**5, bursts = (10, 10**3, 10**4, 10**5, 10**6)):
+	'''
+	`Heap.insert_many` against an `insert` per item, for bursts into a heap
+	of `n`. "random" bursts barely sift, "ahead" ones all belong in front of
+	everything queued so far, which is the worst case for sifting up
+	'''
+	rng = Random(4)
+	base = [rng.random() for _ in range(n)]
+	for k in bursts:
+		for name, burst in (('random', [rng.random() for _ in range(k)]), ('ahead', [-float(i) for i in range(k)])):
+			timings = list[float]()
+			for batched in (False, True):
+				ds = Heap()
+				ds.insert_many(base)
+				ds.init()
+				if batched:
+					timings.append(_time(lambda: ds.insert_many(burst)))
+				else:
+					timings.append(_time(lambda: [ds.insert(x) for x in burst]))
+			print(f'{name:<6} burst {k:>8} into {n}   insert {timings[0]*1e3:9.2f} ms   insert_many {timings[1]*1e3:9.2f} ms   x{timings[0]/timings[1]:5.2f}')
+
+def bench_arity (sizes = (10**4, 10**5, 10**6), arities = (2, 4, 8), ops: int = 10**5):
+	'''
+	A matrix of heap arity against size and the share of inserts among the
+	operations (the rest being `extract_min`s), with a Python `cmp` that
+	counts its calls, so both time and comparisons per operation show
+	'''
+	rng = Random(5)
+	mixes = (('insert 75%', 0.75), ('hold 50%', 0.5), ('extract 75%', 0.25))
+	print(f'{"":<22}' + ''.join(f'{"d=" + str(d):>24}' for d in arities))
+	for n in sizes:
+		base = [rng.random() for _ in range(n)]
+		for name, p_insert in mixes:
+			steps = [rng.random() if rng.random() < p_insert else None for _ in range(ops)]
+			cells = list[str]()
+			for d in arities:
+				calls = 0
+				def cmp (a, b):
+					nonlocal calls
+					calls += 1
+					return a <= b
+				ds = Heap(cmp=cmp, arity=d)
+				ds.insert_many(base)
+				ds.init()
+				calls = 0
+				def run ():
+					for k in steps:
+						if k is None:
+							ds.extract_min()
+						else:
+							ds.insert(k)
+				took = _time(run)
+				cells.append(f'{took*1e9/ops:8.0f} ns {calls/ops:5.1f} cmp')
+			print(f'n={n:<8} {name:<12}' + ''.join(f'{c:>24}' for c in cells))
+
+def bench_batched_pops (n: int = 10**5, ks = (1, 10, 100, 1000)):
+	'''
+	`extract_many(k)` against `k` `extract_min`s, and `peek_many(k)`, on a
+	`Priority` with `n` presorted entries (a tenth of them deleted, leaving
+	holes) and `n` more in the heap
+	'''
+	rng = Random(6)
+	base = [rng.random() for _ in range(n)]
+	more = [rng.random() for _ in range(n)]
+	def fresh () -> Priority:
+		ds = Priority()
+		handles = ds.insert_many(base)
+		ds.init()
+		for h in handles[::10]:
+			ds.delete(h)
+		ds.insert_many(more)
+		return ds
+	for k in ks:
+		rounds = n // k
+		ds = fresh()
+		single = _time(lambda: [[ds.extract_min() for _ in range(k)] for _ in range(rounds)])
+		ds = fresh()
+		batched = _time(lambda: [ds.extract_many(k) for _ in range(rounds)])
+		peek = _time(lambda: [ds.peek_many(k) for _ in range(10)]) / 10
+		print(f'k={k:<6} extract_min x k {single*1e9/n:8.1f} ns/item   extract_many {batched*1e9/n:8.1f} ns/item   x{single/batched:5.2f}   peek_many {peek*1e6:9.1f} us')
+
+# sorts after every item the contention benchmarks put in
+_STOP = 2.0
+
+def _global_lock_run (producers: list, m: int, batch: int):
+	'Every `Priority` call under one plain lock, consumers polling, as the scheduler did'
+	ds, lock = Priority(), Lock()
+	ds.init()
+	def produce (keys):
+		for i in range(0, len(keys), batch):
+			with lock:
+				ds.insert_many(keys[i:i+batch])
+	def consume ():
+		while True:
+			with lock:
+				got = ds.extract_many(batch)
+			if len(got) == 0:
+				sleep(0)
+			elif got[-1] == _STOP:
+				with lock:
+					ds.insert_many(got[got.index(_STOP)+1:])
+				return
+	_run_threads(producers, m, produce, consume, lambda: [ds.insert(_STOP) for _ in range(m)])
+
+def _concurrent_run (producers: list, m: int, batch: int):
+	ds = ConcurrentPriority(maxsize=1 << 12)
+	def produce (keys):
+		if batch == 1:
+			for key in keys:
+				ds.put(key)
+		else:
+			for i in range(0, len(keys), batch):
+				ds.put_many(keys[i:i+batch])
+	def consume ():
+		while True:
+			got = [ds.get()] if batch == 1 else ds.get_many(batch)
+			if got[-1] == _STOP:
+				# a batch can take another consumer's stop too, so hand those back
+				ds.put_many(got[got.index(_STOP)+1:])
+				return
+	_run_threads(producers, m, produce, consume, lambda: ds.put_many([_STOP] * m))
+
+def _run_threads (producers: list, m: int, produce, consume, stop):
+	threads = [Thread(target=produce, args=(keys,)) for keys in producers]
+	consumers = [Thread(target=consume) for _ in range(m)]
+	for t in threads + consumers:
+		t.start()
+	for t in threads:
+		t.join()
+	stop()
+	for t in consumers:
+		t.join()
+
+def _async_run (producers: list, m: int, batch: int):
+	async def main ():
+		ds = AsyncPriority(maxsize=1 << 12)
+		async def produce (keys):
+			for i in range(0, len(keys), batch):
+				await ds.put_many(keys[i:i+batch])
+		async def consume ():
+			while True:
+				got = await ds.get_many(batch)
+				if got[-1] == _STOP:
+					await ds.put_many(got[got.index(_STOP)+1:])
+					return
+		consumers = [asyncio.create_task(consume()) for _ in range(m)]
+		await asyncio.gather(*(produce(keys) for keys in producers))
+		await ds.put_many([_STOP] * m)
+		await asyncio.gather(*consumers)
+	asyncio.run(main())
+
+def bench_contention (n: int = 10**5, shapes = ((1, 1), (4, 4), (8, 2), (2, 8)), batch: int = 64):
+	'''
+	`n` random keys pushed through by `N` producers and taken by `M`
+	consumers. A `Priority` under one plain lock with polling consumers,
+	against `ConcurrentPriority` one at a time and in batches, and
+	`AsyncPriority` with tasks instead of threads
+	'''
+	rng = Random(7)
+	keys = [rng.random() for _ in range(n)]
+	runs = (
+		('global lock', _global_lock_run, 1),
+		(f'global lock x{batch}', _global_lock_run, batch),
+		('concurrent', _concurrent_run, 1),
+		(f'concurrent x{batch}', _concurrent_run, batch),
+		(f'async x{batch}', _async_run, batch),
+	)
+	for n_prod, m in shapes:
+		producers = [keys[i::n_prod] for i in range(n_prod)]
+		cols = []
+		for name, run, b in runs:
+			t = _time(lambda: run(producers, m, b))
+			cols.append(f'{name} {n/t/1e3:7.1f}k/s')
+		print(f'N={n_prod} M={m}  ' + '  '.join(cols))
+
+def _spike (make, n: int, keep: int, hold: int, finish) -> tuple[float, float, float]:
+	'''
+	A queue that briefly holds `n` items, drained to `keep` and then held
+	there for `hold` insert/extract pairs. Gives the traced MB at the peak
+	and at the end, after `finish(ds)`, and the seconds the hold took
+	'''
+	rng = Random(8)
+	trace_start()
+	ds = make()
+	for _ in range(n):
+		ds.insert(rng.random())
+	ds.init()
+	peak = get_traced_memory()[0]
+	for _ in range(n - keep):
+		ds.extract_min()
+	start = perf_counter()
+	for _ in range(hold):
+		ds.insert(rng.random())
+		ds.extract_min()
+	held = perf_counter() - start
+	finish(ds)
+	end = get_traced_memory()[0]
+	trace_stop()
+	return peak / 2**20, end / 2**20, held
+
+def bench_memory (n: int = 10**6, keep: int = 10**3, hold: int = 10**5):
+	'''
+	What a long-running queue keeps after a spike, by `tracemalloc`: nothing
+	done, `low_water=0.125` with and without `on_compact`, and one
+	`shrink_to_fit` or `compact` at the end.
+	The `Priority` takes all `n` before `init`, so they're presorted
+	'''
+	nothing = lambda ds: None
+	runs = (
+		('as is', {}, nothing),
+		('low_water', {'low_water': 0.125}, nothing),
+		('shrink_to_fit', {}, lambda ds: ds.shrink_to_fit()),
+		('low_water, on_compact', {'low_water': 0.125, 'on_compact': lambda remap: None}, nothing),
+		('compact', {}, lambda ds: ds.compact()),
+	)
+	for cls in (Heap, Priority):
+		for name, kwargs, finish in runs:
+			peak, end, held = _spike(lambda: cls(**kwargs), n, keep, hold, finish)
+			print(f'{cls.__name__:<9} {name:<26} peak {peak:7.1f} MB   after {end:7.2f} MB   hold {held*1e9/hold:6.0f} ns/pair')
+
+def bench_external (memory: int = 5 * 10**4, ratios = (1, 4, 16)):
+	'''
+	Filling and then draining `ExternalPriority` with `memory` items held in
+	RAM and `ratio` times as many overall, with the `pickle` and `marshal`
+	codecs, against a plain `Heap` that holds the lot
+	'''
+	rng = Random(9)
+	for ratio in ratios:
+		n = memory * ratio
+		keys = [rng.random() for _ in range(n)]
+		def fill_drain (ds):
+			for key in keys:
+				ds.insert(key)
+			for _ in range(n):
+				ds.extract_min()
+		heap = Heap()
+		heap.init()
+		cols = [f'Heap {n/_time(lambda: fill_drain(heap))/1e3:6.1f}k/s']
+		for codec in (pickle, marshal):
+			ds = ExternalPriority(memory=memory, codec=codec)
+			t = _time(lambda: fill_drain(ds))
+			cols.append(f'{codec.__name__} {n/t/1e3:6.1f}k/s spilled {ds.spilled/n:4.0%}')
+		print(f'n={n:<8} ' + '   '.join(cols))
+
+
+if __name__ == '__main__':
+	bench_heap_storage()
+	bench_update()
+	bench_key_mode()
+	bench_insert_many()
+	bench_arity()
+	bench_batched_pops()
+	bench_contention()
+	bench_memory()
+	bench_external()
@@ -0,0 +1,267 @@
+import asyncio
+from collections import deque
+from queue import Empty, Full
+from threading import Condition, Lock
+from time import monotonic
+from typing import Generic, Iterable, TypeVar
+from ds_priority import Priority
+
+T = TypeVar('T')
+
+
+class ConcurrentPriority(Generic[T]):
+	'''
+	A `Priority` behind one lock, for threads to feed and drain at once.
+	`items` given up front go into the presorted array and everything `put`
+	after goes into the heap, the same as inserting before and after `init`.
+	With `maxsize > 0` it's bounded and `put`s wait for room. `Empty` and
+	`Full` are the `queue` module's, as are the `block`/`timeout` rules.
+
+	`put` hands back a ticket rather than the bare `Priority` handle. Heap
+	handles get reused once their item is taken, and a cancel racing a
+	consumer can easily land after that, so a ticket is `(handle, stamp)`
+	and `delete` only removes the item it was issued for. The tickets for
+	the `items` given up front are in `initial`, in the same order.
+	`low_water` goes to the `Priority`, always as a `shrink_to_fit` since
+	a `compact` would renumber the handles behind the tickets.
+	'''
+	def __init__ (self, items: Iterable[T] = (), cmp = None, key = None, arity: int = 2, maxsize: int = 0, low_water: float = 0):
+		prio = self.prio = Priority[T](cmp=cmp, key=key, arity=arity, low_water=low_water)
+		handles = prio.insert_many(items)
+		prio.init()
+		self.maxsize = maxsize
+		self.count = len(handles)
+		if maxsize > 0:
+			assert self.count <= maxsize
+		# `stamps[h]` counts the `put`s that got heap handle `h`, presorted
+		# handles are never handed out twice so theirs stay at 0
+		self.stamps = dict[int, int]()
+		self.initial = [(h, 0) for h in handles]
+		self.lock = Lock()
+		self.not_empty = Condition(self.lock)
+		self.not_full = Condition(self.lock)
+
+	def _room (self, n: int) -> bool:
+		return self.maxsize <= 0 or self.count + n <= self.maxsize
+
+	def _check_batch (self, n: int):
+		if self.maxsize > 0 and n > self.maxsize:
+			raise ValueError(f'a batch of {n} can never fit in a queue of {self.maxsize}')
+
+	def _has_items (self) -> bool:
+		return not self.prio.is_empty
+
+	def _give (self, items: list[T]) -> list[tuple[int, int]]:
+		'Inserts `items` and wakes whoever waits on them, the lock being held'
+		stamps = self.stamps
+		tickets = list[tuple[int, int]]()
+		for h in self.prio.insert_many(items):
+			s = stamps.get(h, 0) + 1
+			stamps[h] = s
+			tickets.append((h, s))
+		self.count += len(items)
+		self._notify_put(len(items))
+		return tickets
+
+	def _take (self, k: int) -> list[T]:
+		'Up to `k` of the smallest items, the lock being held'
+		if k == 1:
+			out = [self.prio.extract_min()]
+		else:
+			out = self.prio.extract_many(k)
+		self.count -= len(out)
+		self._notify_taken(len(out))
+		return out
+
+	def _notify_put (self, n: int):
+		self.not_empty.notify(n)
+
+	def _notify_taken (self, n: int):
+		# every waiting `put` gets woken, not just `n` of them: one woken for
+		# a `put_many` that still doesn't fit would go back to sleep and sit
+		# on a wakeup a smaller `put` behind it could have used
+		if self.maxsize > 0:
+			self.not_full.notify_all()
+
+	@staticmethod
+	def _wait (cond: Condition, ready, block: bool, timeout: float | None, exc: type):
+		if not block:
+			if not ready():
+				raise exc
+		elif not cond.wait_for(ready, timeout):
+			raise exc
+
+	def put (self, item: T, block: bool = True, timeout: float = None) -> tuple[int, int]:
+		with self.lock:
+			self._wait(self.not_full, lambda: self._room(1), block, timeout, Full)
+			return self._give([item])[0]
+
+	def put_many (self, items: Iterable[T], block: bool = True, timeout: float = None) -> list[tuple[int, int]]:
+		'''
+		`put` for a whole batch under one lock, through `Priority.insert_many`.
+		When bounded it waits until the whole batch fits, so they all go in or
+		none do
+		'''
+		items = list(items)
+		self._check_batch(len(items))
+		with self.lock:
+			self._wait(self.not_full, lambda: self._room(len(items)), block, timeout, Full)
+			return self._give(items)
+
+	def put_nowait (self, item: T) -> tuple[int, int]:
+		return self.put(item, block=False)
+
+	def get (self, block: bool = True, timeout: float = None) -> T:
+		with self.lock:
+			self._wait(self.not_empty, self._has_items, block, timeout, Empty)
+			return self._take(1)[0]
+
+	def get_many (self, k: int, block: bool = True, timeout: float = None) -> list[T]:
+		'''
+		Waits for at least one item like `get`, then takes up to `k` of the
+		smallest in one go through `Priority.extract_many`
+		'''
+		with self.lock:
+			self._wait(self.not_empty, self._has_items, block, timeout, Empty)
+			return self._take(k)
+
+	def get_nowait (self) -> T:
+		return self.get(block=False)
+
+	def delete (self, ticket: tuple[int, int]) -> bool:
+		'''
+		Cancels the item `ticket` was issued for. Gives `False` if that one's
+		already been taken or deleted, leaving whatever is there now alone
+		'''
+		h, s = ticket
+		with self.lock:
+			if not self.prio.is_live(h) or self.stamps.get(h, 0) != s:
+				return False
+			self.prio.delete(h)
+			self.count -= 1
+			self._notify_taken(1)
+			return True
+
+	def shrink_to_fit (self):
+		'''
+		`Priority.shrink_to_fit`, which keeps every handle and so every
+		ticket. There's no `compact` here since it would renumber them
+		'''
+		with self.lock:
+			self.prio.shrink_to_fit()
+
+	def qsize (self) -> int:
+		with self.lock:
+			return self.count
+
+	def empty (self) -> bool:
+		with self.lock:
+			return self.count == 0
+
+	def __len__ (self):
+		return self.qsize()
+
+
+def _wake (fut: asyncio.Future):
+	if not fut.done():
+		fut.set_result(None)
+
+
+class AsyncPriority(ConcurrentPriority[T]):
+	'''
+	`ConcurrentPriority` with `get`, `get_many`, `put` and `put_many` as
+	coroutines. A task that has to wait parks a future that whichever
+	thread frees things up wakes through the future's own loop, so tasks on
+	any loop can share one queue with plain threads. Those use `put_nowait`,
+	`get_nowait` and `delete`, or block through the `ConcurrentPriority`
+	methods, e.g. `ConcurrentPriority.get(q, timeout=1)`.
+	'''
+	def __init__ (self, items: Iterable[T] = (), cmp = None, key = None, arity: int = 2, maxsize: int = 0, low_water: float = 0):
+		super().__init__(items, cmp=cmp, key=key, arity=arity, maxsize=maxsize, low_water=low_water)
+		self.getters = deque[asyncio.Future]()
+		self.putters = deque[asyncio.Future]()
+
+	def _notify_put (self, n: int):
+		super()._notify_put(n)
+		self._wake_some(self.getters, n)
+
+	def _notify_taken (self, n: int):
+		super()._notify_taken(n)
+		# all of them, for the same reason as the threads
+		self._wake_some(self.putters, len(self.putters))
+
+	@staticmethod
+	def _wake_some (waiters: deque, n: int):
+		while n > 0 and len(waiters) > 0:
+			fut = waiters.popleft()
+			try:
+				fut.get_loop().call_soon_threadsafe(_wake, fut)
+			except RuntimeError:
+				# its loop is closed, so nobody's waiting on it any more
+				continue
+			n -= 1
+
+	async def _sleep (self, waiters: deque, fut: asyncio.Future, deadline: float | None, exc: type):
+		'''
+		Waits on a parked `fut` until woken, the `deadline` passes (raising
+		`exc`) or the task gets cancelled. A wakeup it got but can't use is
+		passed on to the next waiter
+		'''
+		try:
+			if deadline is None:
+				await fut
+			else:
+				left = deadline - monotonic()
+				if left <= 0:
+					raise exc
+				try:
+					await asyncio.wait_for(fut, left)
+				except TimeoutError:
+					raise exc from None
+		except BaseException:
+			with self.lock:
+				if fut in waiters:
+					waiters.remove(fut)
+				else:
+					self._wake_some(waiters, 1)
+			raise
+
+	async def _await (self, waiters: deque, ready, attempt, block: bool, timeout: float | None, exc: type):
+		'''
+		The async `_wait`, then whatever `attempt` does once `ready`. A woken
+		putter whose batch still doesn't fit just parks again: `_notify_taken`
+		woke every putter parked at the time, so there's nobody left behind
+		it to pass the wakeup on to, and anyone parking since saw the room
+		for themselves
+		'''
+		deadline = None if timeout is None else monotonic() + timeout
+		loop = asyncio.get_running_loop()
+		while True:
+			with self.lock:
+				if ready():
+					return attempt()
+				if not block:
+					raise exc
+				fut = loop.create_future()
+				waiters.append(fut)
+			await self._sleep(waiters, fut, deadline, exc)
+
+	async def put (self, item: T, block: bool = True, timeout: float = None) -> tuple[int, int]:
+		return await self._await(self.putters, lambda: self._room(1), lambda: self._give([item])[0], block, timeout, Full)
+
+	async def put_many (self, items: Iterable[T], block: bool = True, timeout: float = None) -> list[tuple[int, int]]:
+		items = list(items)
+		self._check_batch(len(items))
+		return await self._await(self.putters, lambda: self._room(len(items)), lambda: self._give(items), block, timeout, Full)
+
+	def put_nowait (self, item: T) -> tuple[int, int]:
+		return ConcurrentPriority.put(self, item, block=False)
+
+	async def get (self, block: bool = True, timeout: float = None) -> T:
+		return await self._await(self.getters, self._has_items, lambda: self._take(1)[0], block, timeout, Empty)
+
+	async def get_many (self, k: int, block: bool = True, timeout: float = None) -> list[T]:
+		return await self._await(self.getters, self._has_items, lambda: self._take(k), block, timeout, Empty)
+
+	def get_nowait (self) -> T:
+		return ConcurrentPriority.get(self, block=False)
@@ -0,0 +1,255 @@
+import pickle
+from functools import cmp_to_key
+from heapq import heapify, heappush, heappop, heapreplace
+from struct import Struct
+from tempfile import TemporaryFile
+from typing import Generic, Iterable, TypeVar
+from ds_heap import Heap, _ByCmp
+
+T = TypeVar('T')
+
+# each block of a run is its encoded length then the encoded list of items
+_FRAME = Struct('<Q')
+
+
+class _Run:
+	'''
+	One sorted run on disk, smallest first, read back a block at a time.
+	`buf[pos]` is its current head. `level` is how many merges it's made of
+	'''
+	__slots__ = 'file', 'codec', 'level', 'buf', 'pos'
+	def __init__ (self, file, codec, level: int):
+		self.file = file
+		self.codec = codec
+		self.level = level
+		self.buf = list()
+		self.pos = 0
+
+	def next_block (self) -> bool:
+		'Reads the next block into `buf`, or closes the file and gives `False` at the end'
+		head = self.file.read(_FRAME.size)
+		if len(head) < _FRAME.size:
+			self.file.close()
+			self.buf = list()
+			return False
+		self.buf = self.codec.loads(self.file.read(_FRAME.unpack(head)[0]))
+		self.pos = 0
+		return True
+
+
+class ExternalPriority(Generic[T]):
+	'''
+	A priority queue that holds at most `memory` items in a `Heap` and
+	spills the rest to temporary files. When the heap fills up, its larger
+	half gets sorted and written out as a run, the smaller half stays put.
+	Each run then works like `Priority`'s presorted array, and `extract_min`
+	takes from whichever of the heap and the runs' heads is smallest, the
+	runs being read lazily `block` items at a time. Once `fan_in` runs are
+	on the same level they get merged into one on the next level up, so
+	there are O(fan_in log n) runs to buffer and each item gets rewritten
+	O(log n) times, the log being base `fan_in`.
+
+	`codec` is anything with `dumps(list) -> bytes` and `loads(bytes) ->
+	list`, `pickle` by default, `marshal` being a faster one for plain
+	values. Items only go out in blocks, and there are no handles, since
+	deleting something already on disk would mean rewriting its run.
+	'''
+	def __init__ (self, cmp = None, key = None, memory: int = 1 << 16, block: int = 1 << 10,
+			fan_in: int = 64, codec = pickle, dir: str = None, arity: int = 2):
+		assert memory >= 2 and block >= 1 and fan_in >= 2
+		self.key = key
+		self.memory = memory
+		self.block = block
+		self.fan_in = fan_in
+		self.codec = codec
+		self.dir = dir
+		self.arity = arity
+		self.cmp = cmp
+		self.heap = self._new_heap()
+		self.cmp = self.heap.cmp
+		if key is not None:
+			self.sort_key = key
+		elif cmp is not None:
+			def three_way (a, b):
+				if not cmp(b, a):
+					return -1
+				return 0 if cmp(a, b) else 1
+			self.sort_key = cmp_to_key(three_way)
+		else:
+			self.sort_key = None
+		self.runs = dict[int, _Run]()
+		self.run_no = 0
+		# `levels[l]` are the numbers of the runs on level `l`
+		self.levels = list[list[int]]()
+		# the runs' heads, `(key, run_no, item)` with `key=` or `_ByCmp`s
+		# with `run_no` as their `pos` otherwise. the run numbers keep the
+		# items themselves out of the tuple compares
+		self.heads = list()
+		self.count = 0
+		self.spilled = 0
+
+	def _new_heap (ds, presorted: list[T] = ()) -> Heap[T]:
+		'''
+		A `Heap` holding `presorted`, which has to be in order already. Before
+		`init` that's only appended, and a sorted list is a valid heap, so
+		it's marked initialized without `init`'s pass over it
+		'''
+		heap = Heap[T](size=ds.memory, cmp=ds.cmp, key=ds.key, arity=ds.arity)
+		heap.insert_many(presorted)
+		heap.initialized = True
+		return heap
+
+	def _head (ds, run_no: int, item: T):
+		if ds.key is not None:
+			return (ds.key(item), run_no, item)
+		return _ByCmp(ds.cmp, item, run_no)
+
+	def _head_item (ds, head) -> T:
+		return head[2] if ds.key is not None else head.item
+
+	def _head_run (ds, head) -> int:
+		return head[1] if ds.key is not None else head.pos
+
+	def _write_run (ds, items: Iterable[T], level: int = 0):
+		'Writes already sorted `items` out as a new run on `level`, and adds its head'
+		file = TemporaryFile(dir=ds.dir)
+		dumps, block = ds.codec.dumps, ds.block
+		chunk = list[T]()
+		for item in items:
+			chunk.append(item)
+			if len(chunk) == block:
+				data = dumps(chunk)
+				file.write(_FRAME.pack(len(data)))
+				file.write(data)
+				chunk = list[T]()
+		if len(chunk) > 0:
+			data = dumps(chunk)
+			file.write(_FRAME.pack(len(data)))
+			file.write(data)
+		file.seek(0)
+		run = _Run(file, ds.codec, level)
+		if run.next_block():
+			ds.run_no += 1
+			ds.runs[ds.run_no] = run
+			while len(ds.levels) <= level:
+				ds.levels.append(list[int]())
+			ds.levels[level].append(ds.run_no)
+			heappush(ds.heads, ds._head(ds.run_no, run.buf[0]))
+
+	def _spill (ds):
+		'''
+		Sorts what's in memory and writes the larger half out as a run,
+		keeping the smaller half as the new heap, which being sorted needs
+		no heapifying
+		'''
+		heap = ds.heap
+		items = [heap.items[h] for h in heap.nodes[1:heap.size+1]]
+		items.sort(key=ds.sort_key)
+		keep = ds.memory >> 1
+		ds._write_run(items[keep:])
+		ds.spilled += len(items) - keep
+		level = 0
+		while level < len(ds.levels) and len(ds.levels[level]) >= ds.fan_in:
+			ds._merge_level(level)
+			level += 1
+		ds.heap = ds._new_heap(items[:keep])
+
+	def _pop_run (ds, heads: list = None) -> T:
+		'Takes the smallest of `heads` (all of them by default) and moves that run on'
+		if heads is None:
+			heads = ds.heads
+		head = heads[0]
+		item = ds._head_item(head)
+		run_no = ds._head_run(head)
+		run = ds.runs[run_no]
+		run.pos += 1
+		if run.pos < len(run.buf) or run.next_block():
+			heapreplace(heads, ds._head(run_no, run.buf[run.pos]))
+		else:
+			heappop(heads)
+			del ds.runs[run_no]
+			level = ds.levels[run.level]
+			if run_no in level:
+				level.remove(run_no)
+		return item
+
+	def _merge_level (ds, level: int):
+		'''
+		Streams the runs on `level`, from wherever each one is up to, into a
+		single new one on the level above
+		'''
+		merging = set(ds.levels[level])
+		ds.levels[level] = list[int]()
+		mine = [h for h in ds.heads if ds._head_run(h) in merging]
+		ds.heads = [h for h in ds.heads if ds._head_run(h) not in merging]
+		heapify(mine)
+		heapify(ds.heads)
+		def merged ():
+			while len(mine) > 0:
+				yield ds._pop_run(mine)
+		ds._write_run(merged(), level + 1)
+
+	def _run_first (ds) -> bool:
+		'Whether the smallest run head comes before the heap\'s min, neither being empty'
+		heap, head = ds.heap, ds.heads[0]
+		if ds.key is not None:
+			return head[0] < heap.keys[heap.nodes[1]]
+		return not ds.cmp(heap.min(), head.item)
+
+	def insert (ds, new_item: T):
+		if ds.heap.size >= ds.memory:
+			ds._spill()
+		ds.heap.insert(new_item)
+		ds.count += 1
+
+	def insert_many (ds, new_items: Iterable[T]):
+		'`insert` for a whole batch, filling the heap up to `memory` at a time'
+		new_items = new_items if isinstance(new_items, list) else list(new_items)
+		i = 0
+		while i < len(new_items):
+			if ds.heap.size >= ds.memory:
+				ds._spill()
+			j = i + ds.memory - ds.heap.size
+			ds.heap.insert_many(new_items[i:j])
+			ds.count += len(new_items[i:j])
+			i = j
+
+	def extract_min (ds) -> T:
+		if ds.count == 0:
+			return None
+		ds.count -= 1
+		if len(ds.heads) > 0 and (ds.heap.size == 0 or ds._run_first()):
+			return ds._pop_run()
+		return ds.heap.extract_min()
+
+	def min (ds) -> T:
+		if len(ds.heads) > 0 and (ds.heap.size == 0 or ds._run_first()):
+			return ds._head_item(ds.heads[0])
+		return ds.heap.min()
+
+	def drain (ds):
+		'Lazily yields `extract_min`s until the queue is empty, like `Priority.drain`'
+		while ds.count > 0:
+			yield ds.extract_min()
+
+	@property
+	def is_empty (ds):
+		return ds.count == 0
+
+	def close (ds):
+		'Deletes every run file, leaving just what was in memory'
+		for run in ds.runs.values():
+			run.file.close()
+		ds.count = ds.heap.size
+		ds.runs.clear()
+		ds.levels.clear()
+		ds.heads.clear()
+
+	def __enter__ (ds):
+		return ds
+
+	def __exit__ (ds, *exc):
+		ds.close()
+
+	def __len__ (ds):
+		return ds.count
@@ -1,143 +1,473 @@
-from typing import TypeVar, Generic
-DEFAULT_SIZE = 32
-
-T = TypeVar('T')
-S = TypeVar('S')
-class Heap(Generic[T]):
-	class HandleElem(Generic[S]):
-		__slots__ = 'node', 'item'
-		def __init__ (self, item: S = None, node: int = 0):
-			self.item = item
-			self.node = node
-	
-	def __init__ (self, size = DEFAULT_SIZE, cmp = None):
-		if cmp is None:
-			cmp = lambda a, b: a <= b
-		
-		self.size = 0
-		self.size_max = size
-		self.free_list = 0
-		self.initialized = False
-		self.cmp = cmp
-
-		self.handles = self._realloc_handles(size, setatr=False)
-		self.nodes   = self._realloc_nodes(size, setatr=False)
-		self.nodes[1] = 1
-
-	def _thethree (self):
-		return self.nodes, self.handles, self.cmp
-
-	def _realloc_nodes (self, size: int = -1, setatr = True):
-		size = (self.size_max if size == -1 else size) + 1
-		newn = [-1] * (size + 1)
-		if setatr:
-			newn[:len(self.nodes)] = self.nodes
-		self.nodes = newn
-		return newn
-
-	def _realloc_handles (self, size: int = -1, setatr = True) -> list[HandleElem[T]]:
-		size = (self.size_max if size == -1 else size) + 1
-		newn = [self.HandleElem[T]() for _ in range(size + 1)]
-		if setatr:
-			newn[:len(self.handles)] = self.handles
-		self.handles = newn
-		return newn
-
-	def float_down (ds, cur: int):
-		n, h, cmp = ds._thethree()
-		h_cur = n[cur]
-		while True:
-			child = cur << 1
-			if child < ds.size and cmp(h[n[child+1]].item, h[n[child]].item):
-				child += 1
-			assert child <= ds.size_max
-			h_child = n[child]
-			if child > ds.size or cmp(h[h_cur].item, h[h_child].item):
-				n[cur] = h_cur
-				h[h_cur].node = cur
-				break
-			n[cur] = h_child
-			h[h_child].node = cur
-			cur = child
-
-	def float_up (ds, cur: int):
-		n, h, cmp = ds._thethree()
-		h_cur = n[cur]
-		while True:
-			parent = cur >> 1
-			h_parent = n[parent]
-			if parent == 0 or cmp(h[h_parent].item, h[h_cur].item):
-				n[cur] = h_cur
-				h[h_cur].node = cur
-				break
-			n[cur] = h_parent
-			h[h_parent].node = cur
-			cur = parent
-
-	def init (ds):
-		for i in range(ds.size, 0, -1):
-			ds.float_down(i)
-		ds.initialized = True
-
-	def insert (ds, new_item: T):
-		ds.size += 1
-		cur = ds.size
-		if (cur << 1) > ds.size_max:
-			ds.size_max <<= 1
-			ds._realloc_handles()
-			ds._realloc_nodes()
-		if ds.free_list == 0:
-			free = cur
-		else:
-			free = ds.free_list
-			ds.free_list = ds.handles[free].node
-		ds.nodes[cur] = free
-		hh = ds.handles[free]
-		hh.node = cur
-		hh.item = new_item
-		if ds.initialized:
-			ds.float_up(cur)
-		return free
-
-	def extract_min (ds) -> T:
-		n, h, _ = ds._thethree()
-		h_min = n[1]
-		min_v = h[h_min].item
-		if ds.size > 0:
-			n[1] = n[ds.size]
-			h[n[1]].node = 1
-			h[h_min].item = None
-			h[h_min].node = ds.free_list
-			ds.free_list = h_min
-			ds.size -= 1
-			if ds.size > 0:
-				ds.float_down(1)
-		return min_v
-
-	def delete (ds, h_cur: int):
-		n, h, cmp = ds._thethree()
-		assert (1 <= h_cur <= ds.size_max) and (h[h_cur].item is not None)
-		cur = h[h_cur].node
-		n[cur] = n[ds.size]
-		h[n[cur]].node = cur
-		ds.size -= 1
-		if cur <= ds.size:
-			if cur <= 1 or cmp(h[n[cur>>1]].item, h[n[cur]].item):
-				ds.float_down(cur)
-			else:
-				ds.float_up(cur)
-		h[h_cur].item = None
-		h[h_cur].node = ds.free_list
-		ds.free_list = h_cur
-
-	def is_empty (ds):
-		return ds.size == 0
-
-	def min (ds) -> T:
-		return ds.handles[ds.nodes[1]].item
-
-	def __len__ (ds):
-		return ds.size
-	
-	def __delitem__ (ds, h_cur: int):
-		ds.delete(h_cur)
+from heapq import heappush, heappop
+from operator import le
+from typing import TypeVar, Generic
+DEFAULT_SIZE = 32
+
+T = TypeVar('T')
+
+
+class _ByCmp:
+	'Orders heap positions by `cmp` on their items, for `heapq`'
+	__slots__ = 'cmp', 'item', 'pos'
+	def __init__ (self, cmp, item, pos: int):
+		self.cmp = cmp
+		self.item = item
+		self.pos = pos
+
+	def __lt__ (self, other) -> bool:
+		return not self.cmp(other.item, self.item)
+
+
+class Heap(Generic[T]):
+	'''
+	A binary min-heap with stable handles, kept as three parallel lists:
+	`nodes[i]` is the handle at heap position `i` (1-based), `handles[h]` is
+	the position of handle `h` (or the next free handle while `h` is on the
+	free list) and `items[h]` is the item itself.
+
+	These are plain lists rather than `array('l')`s on purpose, reading an
+	int back out of an array boxes a new one every time, which costs more
+	than it saves in the sift loops.
+
+	With `key=` each item's key is worked out once on the way in and kept in
+	`keys[h]`, and the sift loops compare those with a plain `<=` instead of
+	calling `cmp`. Without it, `cmp` is used as before.
+
+	`arity=` makes it a d-ary heap, position `i`'s children being
+	`d*(i-1) + 2 ... d*i + 1`. Wider heaps are shallower, so inserts and
+	`update`s that float up take fewer comparisons, at the cost of `d - 1`
+	comparisons per level on the way down. Handles work the same either way.
+
+	The lists only ever grow on their own. `shrink_to_fit` gives back what it
+	can while keeping every handle valid, `compact` renumbers the handles to
+	give back everything and returns the mapping. With `low_water=` set, one
+	of them happens by itself once an `extract_min` or `delete` leaves `size`
+	under that fraction of `size_max`: a `compact` that calls
+	`on_compact(mapping)` if that's given, otherwise a `shrink_to_fit`.
+	'''
+	def __init__ (self, size = DEFAULT_SIZE, cmp = None, key = None, arity: int = 2, low_water: float = 0, on_compact = None):
+		assert arity >= 2
+		if cmp is None:
+			if key is None:
+				cmp = lambda a, b: a <= b
+			else:
+				cmp = lambda a, b: key(a) <= key(b)
+		
+		self.size = 0
+		self.size_max = size
+		self.free_list = 0
+		self.initialized = False
+		self.cmp = cmp
+		self.key = key
+		self.arity = arity
+		self.min_size = size
+		self.low_water = low_water
+		self.on_compact = on_compact
+		self.shrink_at = int(size * low_water)
+
+		self.nodes   = [0] * (size + 2)
+		self.handles = [0] * (size + 2)
+		self.items: list[T] = [None] * (size + 2)
+		self.keys = None if key is None else [None] * (size + 2)
+		self.nodes[1] = 1
+
+	def _grow (ds):
+		'Doubles `size_max`, only appending to the lists so nothing existing gets rebuilt'
+		ds.size_max <<= 1
+		ds.shrink_at = int(ds.size_max * ds.low_water)
+		extra = ds.size_max + 2 - len(ds.nodes)
+		ds.nodes.extend([0] * extra)
+		ds.handles.extend([0] * extra)
+		ds.items.extend([None] * extra)
+		if ds.keys is not None:
+			ds.keys.extend([None] * extra)
+
+	def _leq (ds, h_a: int, h_b: int) -> bool:
+		if ds.keys is not None:
+			return ds.keys[h_a] <= ds.keys[h_b]
+		return ds.cmp(ds.items[h_a], ds.items[h_b])
+
+	def _parent (ds, cur: int) -> int:
+		return (cur + ds.arity - 2) // ds.arity
+
+	def float_down (ds, cur: int):
+		if ds.arity != 2:
+			if ds.keys is not None:
+				return ds._float_down_wide_keys(cur)
+			return ds._float_down_wide(cur)
+		if ds.keys is not None:
+			return ds._float_down_keys(cur)
+		n, h, items, cmp = ds.nodes, ds.handles, ds.items, ds.cmp
+		size = ds.size
+		h_cur = n[cur]
+		item = items[h_cur]
+		while (child := cur << 1) <= size:
+			h_child = n[child]
+			if child < size:
+				h_right = n[child+1]
+				if cmp(items[h_right], items[h_child]):
+					child += 1
+					h_child = h_right
+			if cmp(item, items[h_child]):
+				break
+			n[cur] = h_child
+			h[h_child] = cur
+			cur = child
+		n[cur] = h_cur
+		h[h_cur] = cur
+
+	def float_up (ds, cur: int):
+		if ds.arity != 2:
+			return ds._float_up_wide(cur)
+		if ds.keys is not None:
+			return ds._float_up_keys(cur)
+		n, h, items, cmp = ds.nodes, ds.handles, ds.items, ds.cmp
+		h_cur = n[cur]
+		item = items[h_cur]
+		while cur > 1:
+			parent = cur >> 1
+			h_parent = n[parent]
+			if cmp(items[h_parent], item):
+				break
+			n[cur] = h_parent
+			h[h_parent] = cur
+			cur = parent
+		n[cur] = h_cur
+		h[h_cur] = cur
+
+	def _float_down_keys (ds, cur: int):
+		n, h, keys = ds.nodes, ds.handles, ds.keys
+		size = ds.size
+		h_cur = n[cur]
+		key = keys[h_cur]
+		while (child := cur << 1) <= size:
+			h_child = n[child]
+			if child < size:
+				h_right = n[child+1]
+				if keys[h_right] <= keys[h_child]:
+					child += 1
+					h_child = h_right
+			if key <= keys[h_child]:
+				break
+			n[cur] = h_child
+			h[h_child] = cur
+			cur = child
+		n[cur] = h_cur
+		h[h_cur] = cur
+
+	def _float_up_keys (ds, cur: int):
+		n, h, keys = ds.nodes, ds.handles, ds.keys
+		h_cur = n[cur]
+		key = keys[h_cur]
+		while cur > 1:
+			parent = cur >> 1
+			h_parent = n[parent]
+			if keys[h_parent] <= key:
+				break
+			n[cur] = h_parent
+			h[h_parent] = cur
+			cur = parent
+		n[cur] = h_cur
+		h[h_cur] = cur
+
+	def _float_down_wide (ds, cur: int):
+		n, h, items, cmp, d = ds.nodes, ds.handles, ds.items, ds.cmp, ds.arity
+		size = ds.size
+		h_cur = n[cur]
+		item = items[h_cur]
+		while (first := d * (cur - 1) + 2) <= size:
+			child = first
+			h_child = n[first]
+			best = items[h_child]
+			for c in range(first + 1, min(first + d, size + 1)):
+				h_c = n[c]
+				if cmp(items[h_c], best):
+					child = c
+					h_child = h_c
+					best = items[h_c]
+			if cmp(item, best):
+				break
+			n[cur] = h_child
+			h[h_child] = cur
+			cur = child
+		n[cur] = h_cur
+		h[h_cur] = cur
+
+	def _float_down_wide_keys (ds, cur: int):
+		n, h, keys, d = ds.nodes, ds.handles, ds.keys, ds.arity
+		size = ds.size
+		h_cur = n[cur]
+		key = keys[h_cur]
+		while (first := d * (cur - 1) + 2) <= size:
+			child = first
+			h_child = n[first]
+			best = keys[h_child]
+			for c in range(first + 1, min(first + d, size + 1)):
+				h_c = n[c]
+				if keys[h_c] <= best:
+					child = c
+					h_child = h_c
+					best = keys[h_c]
+			if key <= best:
+				break
+			n[cur] = h_child
+			h[h_child] = cur
+			cur = child
+		n[cur] = h_cur
+		h[h_cur] = cur
+
+	def _float_up_wide (ds, cur: int):
+		n, h, d = ds.nodes, ds.handles, ds.arity
+		if ds.keys is not None:
+			vals, cmp = ds.keys, le
+		else:
+			vals, cmp = ds.items, ds.cmp
+		h_cur = n[cur]
+		val = vals[h_cur]
+		while cur > 1:
+			parent = (cur + d - 2) // d
+			h_parent = n[parent]
+			if cmp(vals[h_parent], val):
+				break
+			n[cur] = h_parent
+			h[h_parent] = cur
+			cur = parent
+		n[cur] = h_cur
+		h[h_cur] = cur
+
+	def init (ds):
+		for i in range(ds.size, 0, -1):
+			ds.float_down(i)
+		ds.initialized = True
+
+	def insert (ds, new_item: T):
+		ds.size += 1
+		cur = ds.size
+		if (cur << 1) > ds.size_max:
+			ds._grow()
+		if ds.free_list == 0:
+			free = cur
+		else:
+			free = ds.free_list
+			ds.free_list = ds.handles[free]
+		ds.nodes[cur] = free
+		ds.handles[free] = cur
+		ds.items[free] = new_item
+		if ds.keys is not None:
+			ds.keys[free] = ds.key(new_item)
+		if ds.initialized:
+			ds.float_up(cur)
+		return free
+
+	def insert_many (ds, new_items) -> list[int]:
+		'''
+		Inserts a whole batch, returning their handles in order. A handful of
+		items get sifted up one by one, otherwise the batch is appended as is
+		and only the part of the heap above it gets rebuilt, bottom-up
+		'''
+		new_items = new_items if isinstance(new_items, list) else list(new_items)
+		count = len(new_items)
+		old_size = ds.size
+		ds.size += count
+		while (ds.size << 1) > ds.size_max:
+			ds._grow()
+		n, h, items, keys, key = ds.nodes, ds.handles, ds.items, ds.keys, ds.key
+		out = [0] * count
+		cur = old_size
+		for j, item in enumerate(new_items):
+			cur += 1
+			if ds.free_list == 0:
+				free = cur
+			else:
+				free = ds.free_list
+				ds.free_list = h[free]
+			n[cur] = free
+			h[free] = cur
+			items[free] = item
+			if keys is not None:
+				keys[free] = key(item)
+			out[j] = free
+		if not ds.initialized:
+			pass
+		elif count <= old_size.bit_length():
+			# too few to be worth going over every level above them
+			for i in range(old_size + 1, ds.size + 1):
+				ds.float_up(i)
+		else:
+			# heapify just the new entries and their ancestors, level by level
+			# from the bottom. each level up there's half as many, so this is
+			# O(count + log(size)) sifts and at most a full O(n) rebuild, where
+			# sifting each one up could cost O(log(size)) apiece
+			parent = ds._parent
+			lo, hi = max(parent(old_size + 1), 1), parent(ds.size)
+			while hi >= lo:
+				for i in range(hi, lo - 1, -1):
+					ds.float_down(i)
+				if lo == 1:
+					break
+				lo, hi = max(parent(lo), 1), min(parent(hi), lo - 1)
+		return out
+
+	def extract_min (ds) -> T:
+		n, h, items = ds.nodes, ds.handles, ds.items
+		h_min = n[1]
+		min_v = items[h_min]
+		if ds.size > 0:
+			n[1] = n[ds.size]
+			h[n[1]] = 1
+			items[h_min] = None
+			if ds.keys is not None:
+				ds.keys[h_min] = None
+			h[h_min] = ds.free_list
+			ds.free_list = h_min
+			ds.size -= 1
+			if ds.size > 0:
+				ds.float_down(1)
+			if ds.size < ds.shrink_at:
+				ds._shrink_low_water()
+		return min_v
+
+	def delete (ds, h_cur: int):
+		n, h, items = ds.nodes, ds.handles, ds.items
+		assert (1 <= h_cur <= ds.size_max) and (items[h_cur] is not None)
+		cur = h[h_cur]
+		n[cur] = n[ds.size]
+		h[n[cur]] = cur
+		ds.size -= 1
+		if cur <= ds.size:
+			if cur <= 1 or ds._leq(n[ds._parent(cur)], n[cur]):
+				ds.float_down(cur)
+			else:
+				ds.float_up(cur)
+		items[h_cur] = None
+		if ds.keys is not None:
+			ds.keys[h_cur] = None
+		h[h_cur] = ds.free_list
+		ds.free_list = h_cur
+		if ds.size < ds.shrink_at:
+			ds._shrink_low_water()
+
+	def _cut (ds, size_max: int):
+		'Cuts every list down to `size_max`, copying so the old ones really get freed'
+		n = size_max + 2
+		ds.nodes = ds.nodes[:n]
+		ds.handles = ds.handles[:n]
+		ds.items = ds.items[:n]
+		if ds.keys is not None:
+			ds.keys = ds.keys[:n]
+		ds.size_max = size_max
+		ds.shrink_at = int(size_max * ds.low_water)
+
+	def shrink_to_fit (ds):
+		'''
+		Gives back the room above the highest live handle, every handle
+		staying valid. Freed handles below that one can't go without
+		renumbering, so they're put back on the free list lowest first, to be
+		reused before anything higher up and let the next shrink go further
+		'''
+		items, h = ds.items, ds.handles
+		top = len(items) - 1
+		while top > 0 and items[top] is None:
+			top -= 1
+		free = 0
+		for i in range(top, 0, -1):
+			if items[i] is None:
+				h[i] = free
+				free = i
+		ds.free_list = free
+		size_max = max(ds.size << 1, top, ds.min_size)
+		if size_max < ds.size_max:
+			ds._cut(size_max)
+
+	def _shrink_low_water (ds):
+		if ds.on_compact is not None:
+			ds.on_compact(ds.compact())
+		else:
+			ds.shrink_to_fit()
+		# a live handle near the top can keep `shrink_to_fit` from doing much,
+		# so either way don't try again until the heap has at least halved
+		ds.shrink_at = min(ds.shrink_at, ds.size >> 1)
+
+	def compact (ds) -> dict[int, int]:
+		'''
+		Renumbers the live handles to `1..size`, each becoming its heap
+		position, and shrinks to fit. Returns `{old: new}` for every live
+		handle, any handle held from before has to be looked up in it
+		'''
+		n, size = ds.nodes, ds.size
+		remap = {n[pos]: pos for pos in range(1, size + 1)}
+		size_max = max(size << 1, ds.min_size)
+		pad = [None] * (size_max + 1 - size)
+		ds.items = [None] + [ds.items[h] for h in n[1:size+1]] + pad
+		if ds.keys is not None:
+			ds.keys = [None] + [ds.keys[h] for h in n[1:size+1]] + pad
+		ds.nodes = list(range(size + 1)) + [0] * len(pad)
+		ds.handles = ds.nodes[:]
+		ds.free_list = 0
+		ds.size_max = size_max
+		ds.shrink_at = int(size_max * ds.low_water)
+		return remap
+
+	def update (ds, h_cur: int, new_item: T) -> int:
+		'''
+		Replaces the item behind `h_cur` and sifts it up or down from where it
+		is, rather than a `delete` plus `insert`. The handle stays the same
+		'''
+		n, items = ds.nodes, ds.items
+		assert (1 <= h_cur <= ds.size_max) and (items[h_cur] is not None)
+		items[h_cur] = new_item
+		if ds.keys is not None:
+			ds.keys[h_cur] = ds.key(new_item)
+		if not ds.initialized:
+			return h_cur
+		cur = ds.handles[h_cur]
+		if cur > 1 and not ds._leq(n[ds._parent(cur)], h_cur):
+			ds.float_up(cur)
+		else:
+			ds.float_down(cur)
+		return h_cur
+
+	def is_empty (ds):
+		return ds.size == 0
+
+	def ordered_handles (ds):
+		'''
+		Lazily yields the handles in item order without extracting anything,
+		by a best-first walk down from the root. Getting the first `k` costs
+		O(k log k), and the heap mustn't change in the meantime
+		'''
+		if ds.size == 0:
+			return
+		n, size, d = ds.nodes, ds.size, ds.arity
+		if ds.keys is not None:
+			keys = ds.keys
+			frontier = [(keys[n[1]], 1)]
+			while len(frontier) > 0:
+				cur = heappop(frontier)[1]
+				yield n[cur]
+				first = d * (cur - 1) + 2
+				for c in range(first, min(first + d, size + 1)):
+					heappush(frontier, (keys[n[c]], c))
+		else:
+			cmp, items = ds.cmp, ds.items
+			frontier = [_ByCmp(cmp, items[n[1]], 1)]
+			while len(frontier) > 0:
+				cur = heappop(frontier).pos
+				yield n[cur]
+				first = d * (cur - 1) + 2
+				for c in range(first, min(first + d, size + 1)):
+					heappush(frontier, _ByCmp(cmp, items[n[c]], c))
+
+	def __iter__ (ds):
+		'The items in order, see `ordered_handles`'
+		items = ds.items
+		return (items[h] for h in ds.ordered_handles())
+
+	def min (ds) -> T:
+		return ds.items[ds.nodes[1]]
+
+	def __len__ (ds):
+		return ds.size
+	
+	def __delitem__ (ds, h_cur: int):
+		ds.delete(h_cur)
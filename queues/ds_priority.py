@@ -1,147 +1,406 @@
-from typing import Generic, TypeVar
-from ds_heap import Heap
-
-DEFAULT_SIZE = 32
-
-T = TypeVar('T')
-class Priority(Generic[T]):
-	def __init__ (self, cmp = None, size = DEFAULT_SIZE):
-		if cmp is None:
-			cmp = lambda a, b: a <= b
-		
-		self.heap = Heap[T](size=size, cmp=cmp)
-		self.items = self._realloc_items(size, setatr=False)
-		self.order = list[int]()
-		self.size = 0
-		self.size_max = size
-		self.initialized = False
-		self.cmp = cmp
-
-	def _realloc_items (self, size: int = -1, setatr = True):
-		size = self.size_max if size == -1 else size
-		newi: list[T] = [None] * size
-		if setatr:
-			newi[:len(self.items)] = self.items
-		self.items = newi
-		return newi
-
-	def __getitem__ (self, order_index: int):
-		return self.items[self.order[order_index]]
-
-	def init (ds, *, debug = False, insr_sort_limit = 10):
-		cmp = ds.cmp
-		order = ds.order = [i for i in range(ds.size)]
-		items = ds.items
-		# perform an iterative impl of quicksort over recursive
-		# technically, theres no reason it cant be recursive, but
-		# libtess went with iterative over recursive and i agree
-		# with that decision so it stays
-		seed: int = 0x7830F0C3
-		stack: list[tuple[int, int]] = [(0, ds.size - 1)]
-		while len(stack) > 0:
-			p, r = stack.pop()
-			while r > (p + insr_sort_limit):
-				# libtess used a u32 for seed, so im adding the bitmask
-				# here to retain behavior even if it doesn't really matter.
-				seed = (seed * 0x5BC19F0D + 1) & 0xFFFFFFFF
-				i = p + seed % (r - p + 1)
-				piv      = order[i]
-				order[i] = order[p]
-				order[p] = piv
-				i = p - 1
-				j = r + 1
-				while True:
-					while True:
-						i += 1
-						if cmp(ds[i], items[piv]):
-							break
-					while True:
-						j -= 1
-						if cmp(items[piv], ds[j]):
-							break
-					if not i < j:
-						break
-					else:
-						order[i], order[j] = order[j], order[i]
-				if (i - p) < (r - j):
-					top = (j + 1, r)
-					r = i - 1
-				else:
-					top = (p, i - 1)
-					p = j + 1
-				stack.append(top)
-			# depending on how large you consider a "small" list to be based
-			# on INSR_SORT_LIMIT, perform an insertion sort on
-			# the partition over quicksort
-			for i in range(p+1, r+1):
-				piv = order[i]
-				j = i
-				while j > p and not cmp(items[piv], ds[j-1]):
-					order[j] = order[j-1]
-					j -= 1
-				order[j] = piv
-		ds.size_max = ds.size
-		ds.initialized = True
-		ds.heap.init()
-		if debug:
-			for i in range(ds.size - 1):
-				assert cmp(ds[i+1], ds[i])
-
-	def insert (ds, new_item: T):
-		if ds.initialized:
-			return ds.heap.insert(new_item)
-		cur = ds.size
-		ds.size += 1
-		if ds.size >= ds.size_max:
-			ds.size_max <<= 1
-			ds._realloc_items()
-		ds.items[cur] = new_item
-		return -(cur + 1)
-
-	def extract_min (ds) -> T:
-		if ds.size == 0:
-			return ds.heap.extract_min()
-		sort_min = ds[ds.size-1]
-		if not ds.heap.is_empty():
-			heap_min = ds.heap.min()
-			if ds.cmp(heap_min, sort_min):
-				return ds.heap.extract_min()
-		while True:
-			ds.size -= 1
-			if ds.size <= 0 or (ds[ds.size-1] is not None):
-				break
-		return sort_min
-
-	@property
-	def is_empty (ds):
-		return ds.size == 0 and ds.heap.is_empty()
-
-	def delete (ds, cur: int):
-		if cur >= 0:
-			del ds.heap[cur]
-			return
-		cur = -(cur + 1)
-		assert cur < ds.size_max and (ds.items[cur] is not None)
-		ds.items[cur] = None
-		while ds.size > 0 and (ds[ds.size-1] is None):
-			ds.size -= 1
-
-	def min (ds) -> T:
-		if ds.size == 0:
-			return ds.heap.min()
-		sort_min = ds[ds.size-1]
-		if not ds.heap.is_empty():
-			heap_min = ds.heap.min()
-			if ds.cmp(heap_min, sort_min):
-				return heap_min
-		return sort_min
-
-	def __len__ (ds):
-		return ds.size
-
-	def __delitem__ (ds, cur: int):
-		ds.delete(ds, cur)
-
-	def __iter__ (ds):
-		for i, _ in zip(ds.order, range(len(ds.size))):
-			yield ds.items[i]
+from itertools import islice
+from operator import le
+from typing import Generic, TypeVar
+from ds_heap import Heap
+
+DEFAULT_SIZE = 32
+
+T = TypeVar('T')
+class Priority(Generic[T]):
+	'''
+	A presorted array plus a `Heap`, like libtess' priority queue. Items
+	inserted before `init` get sorted once (largest first, so the min is at
+	the end of `order`), later ones go into the heap.
+
+	With `key=` each item's key is computed once and stored, the initial
+	sort is the built-in one and every comparison is a plain `<=` on keys.
+	`arity=` picks the heap's branching factor, see `Heap`.
+
+	Taking from the presorted part only moves `size` down, and deleting
+	leaves a `None` hole, so `shrink_to_fit` and `compact` do for it what
+	`Heap`'s do for the heap, under the same rules: the first keeps every
+	handle, the second returns `{old: new}` for all of them. `low_water=`
+	and `on_compact=` work on both parts separately, see `Heap`, so each
+	`on_compact` call only maps the handles of the part that got compacted.
+	'''
+	def __init__ (self, cmp = None, size = DEFAULT_SIZE, key = None, arity: int = 2, low_water: float = 0, on_compact = None):
+		self.heap = Heap[T](size=size, cmp=cmp, key=key, arity=arity, low_water=low_water, on_compact=on_compact)
+		cmp = self.heap.cmp
+		self.key = key
+		self.keys = None if key is None else list[object]()
+		self.items = self._realloc_items(size, setatr=False)
+		self.order = list[int]()
+		# `where[i]` is the position in `order` of `items[i]`, the inverse of
+		# `order`, filled in by `init`
+		self.where = list[int]()
+		self.size = 0
+		self.size_max = size
+		self.initialized = False
+		self.cmp = cmp
+		self.low_water = low_water
+		self.on_compact = on_compact
+		# the presorted part's own low-water mark, set by `init`
+		self.shrink_at = 0
+
+	def _realloc_items (self, size: int = -1, setatr = True):
+		size = self.size_max if size == -1 else size
+		newi: list[T] = [None] * size
+		if setatr:
+			newi[:len(self.items)] = self.items
+		self.items = newi
+		if self.keys is not None:
+			self.keys.extend([None] * (size - len(self.keys)))
+		return newi
+
+	def __getitem__ (self, order_index: int):
+		return self.items[self.order[order_index]]
+
+	def init (ds, *, debug = False, insr_sort_limit = 10):
+		if ds.keys is not None:
+			# stable, so the largest-first order leaves equal keys in insertion order
+			order = ds.order = sorted(range(ds.size), key=ds.keys.__getitem__, reverse=True)
+		else:
+			order = ds._quicksort(insr_sort_limit)
+		where = ds.where = [0] * ds.size
+		for p, i in enumerate(order):
+			where[i] = p
+		ds.size_max = ds.size
+		ds.shrink_at = int(ds.size * ds.low_water)
+		ds.initialized = True
+		ds.heap.init()
+		if debug:
+			for i in range(ds.size - 1):
+				assert ds.cmp(ds[i+1], ds[i])
+
+	def _quicksort (ds, insr_sort_limit: int) -> list[int]:
+		cmp = ds.cmp
+		order = ds.order = [i for i in range(ds.size)]
+		items = ds.items
+		# perform an iterative impl of quicksort over recursive
+		# technically, theres no reason it cant be recursive, but
+		# libtess went with iterative over recursive and i agree
+		# with that decision so it stays
+		seed: int = 0x7830F0C3
+		stack: list[tuple[int, int]] = [(0, ds.size - 1)]
+		while len(stack) > 0:
+			p, r = stack.pop()
+			while r > (p + insr_sort_limit):
+				# libtess used a u32 for seed, so im adding the bitmask
+				# here to retain behavior even if it doesn't really matter.
+				seed = (seed * 0x5BC19F0D + 1) & 0xFFFFFFFF
+				i = p + seed % (r - p + 1)
+				piv      = order[i]
+				order[i] = order[p]
+				order[p] = piv
+				i = p - 1
+				j = r + 1
+				while True:
+					while True:
+						i += 1
+						if cmp(ds[i], items[piv]):
+							break
+					while True:
+						j -= 1
+						if cmp(items[piv], ds[j]):
+							break
+					if not i < j:
+						break
+					else:
+						order[i], order[j] = order[j], order[i]
+				if (i - p) < (r - j):
+					top = (j + 1, r)
+					r = i - 1
+				else:
+					top = (p, i - 1)
+					p = j + 1
+				stack.append(top)
+			# depending on how large you consider a "small" list to be based
+			# on INSR_SORT_LIMIT, perform an insertion sort on
+			# the partition over quicksort
+			for i in range(p+1, r+1):
+				piv = order[i]
+				j = i
+				while j > p and not cmp(items[piv], ds[j-1]):
+					order[j] = order[j-1]
+					j -= 1
+				order[j] = piv
+		return order
+
+	def insert (ds, new_item: T):
+		if ds.initialized:
+			return ds.heap.insert(new_item)
+		cur = ds.size
+		ds.size += 1
+		if ds.size >= ds.size_max:
+			ds.size_max <<= 1
+			ds._realloc_items()
+		ds.items[cur] = new_item
+		if ds.keys is not None:
+			ds.keys[cur] = ds.key(new_item)
+		return -(cur + 1)
+
+	def insert_many (ds, new_items) -> list[int]:
+		'`insert` for a whole batch, see `Heap.insert_many` for after `init`'
+		if ds.initialized:
+			return ds.heap.insert_many(new_items)
+		return [ds.insert(item) for item in new_items]
+
+	def _heap_first (ds) -> bool:
+		'Whether the heap\'s min comes before the presorted min, neither being empty'
+		if ds.keys is not None:
+			heap = ds.heap
+			return heap.keys[heap.nodes[1]] <= ds.keys[ds.order[ds.size-1]]
+		return ds.cmp(ds.heap.min(), ds[ds.size-1])
+
+	def extract_min (ds) -> T:
+		if ds.size == 0:
+			return ds.heap.extract_min()
+		sort_min = ds[ds.size-1]
+		if not ds.heap.is_empty() and ds._heap_first():
+			return ds.heap.extract_min()
+		while True:
+			ds.size -= 1
+			if ds.size <= 0 or (ds[ds.size-1] is not None):
+				break
+		if ds.size < ds.shrink_at:
+			ds._shrink_low_water()
+		return sort_min
+
+	def _merge_parts (ds):
+		'The heap\'s values, the presorted values and how to compare them'
+		if ds.keys is not None:
+			return ds.heap.keys, ds.keys, le
+		return ds.heap.items, ds.items, ds.cmp
+
+	def extract_many (ds, k: int) -> list[T]:
+		'''
+		Up to `k` `extract_min`s in one go. The presorted array and the heap
+		get merged as two sorted streams, one comparison per item, instead of
+		each call checking both minimums and trimming holes again
+		'''
+		assert ds.initialized or ds.size == 0, 'extract_many before init'
+		out = list[T]()
+		heap, items, order = ds.heap, ds.items, ds.order
+		h_vals, s_vals, leq = ds._merge_parts()
+		keyed = ds.keys is not None
+		p = ds.size - 1
+		while len(out) < k:
+			if p < 0:
+				out.extend(heap.extract_min() for _ in range(min(k - len(out), heap.size)))
+				break
+			i = order[p]
+			if items[i] is None:
+				p -= 1
+			elif heap.size > 0 and leq(h_vals[heap.nodes[1]], s_vals[i]):
+				out.append(heap.extract_min())
+				# a low-water shrink swaps the heap's lists for shorter ones
+				h_vals = heap.keys if keyed else heap.items
+			else:
+				out.append(items[i])
+				p -= 1
+		while p >= 0 and items[order[p]] is None:
+			p -= 1
+		ds.size = p + 1
+		if ds.size < ds.shrink_at:
+			ds._shrink_low_water()
+		return out
+
+	def drain (ds):
+		'''
+		Lazily yields `extract_min`s until the queue is empty. Inserting or
+		deleting in between is fine, the next item is always the current min
+		'''
+		while not ds.is_empty:
+			yield ds.extract_min()
+
+	def peek_many (ds, k: int) -> list[T]:
+		'The `k` smallest items in order, without taking them out'
+		return list(islice(ds, k))
+
+	@property
+	def is_empty (ds):
+		return ds.size == 0 and ds.heap.is_empty()
+
+	def is_live (ds, cur: int) -> bool:
+		'''
+		Whether handle `cur` still has its item in the queue. A heap handle
+		that's been freed can get handed out again by a later `insert`, so
+		this says nothing about *which* item is there
+		'''
+		if cur >= 0:
+			heap = ds.heap
+			return 1 <= cur < len(heap.items) and heap.items[cur] is not None
+		i = -(cur + 1)
+		if i >= len(ds.items) or ds.items[i] is None:
+			return False
+		# taking from the presorted part just moves `size` down past it
+		return (ds.where[i] if ds.initialized else i) < ds.size
+
+	def delete (ds, cur: int):
+		if cur >= 0:
+			del ds.heap[cur]
+			return
+		cur = -(cur + 1)
+		assert cur < ds.size_max and (ds.items[cur] is not None)
+		ds.items[cur] = None
+		while ds.size > 0 and (ds[ds.size-1] is None):
+			ds.size -= 1
+		if ds.size < ds.shrink_at:
+			ds._shrink_low_water()
+
+	def _shrink_presorted (ds):
+		'''
+		Drops the presorted entries already taken, which `extract_min` only
+		moved `size` past, and cuts the lists back to the highest one not
+		'''
+		items, keys, order, size = ds.items, ds.keys, ds.order, ds.size
+		for i in order[size:]:
+			items[i] = None
+			if keys is not None:
+				keys[i] = None
+		# holes still in `order[:size]` get read as `None`, so they have to stay
+		top = max(order[:size], default=-1) + 1
+		ds.order = order[:size]
+		# dead entries' positions are never read again, and zeroing them lets
+		# the int objects go too
+		ds.where = [p if item is not None else 0 for p, item in zip(ds.where[:top], items)]
+		ds.items = items[:top]
+		if keys is not None:
+			ds.keys = keys[:top]
+		ds.size_max = top
+		ds.shrink_at = int(size * ds.low_water)
+
+	def _shrink_low_water (ds):
+		if ds.on_compact is not None:
+			ds.on_compact(ds._compact_presorted())
+		else:
+			ds._shrink_presorted()
+
+	def shrink_to_fit (ds):
+		'''
+		Gives back what the heap and the presorted part can without changing
+		any handle: the heap's room above its highest live handle, and the
+		presorted entries already taken, above the highest one that isn't
+		'''
+		ds.heap.shrink_to_fit()
+		if ds.initialized:
+			ds._shrink_presorted()
+
+	def compact (ds) -> dict[int, int]:
+		'''
+		Renumbers every live handle so nothing is left over, holes in the
+		presorted part included, and returns `{old: new}` for each one. The
+		presorted handles end up in `order` order, so `where` and `order`
+		become the identity
+		'''
+		remap = ds.heap.compact()
+		if ds.initialized:
+			remap.update(ds._compact_presorted())
+		return remap
+
+	def _compact_presorted (ds) -> dict[int, int]:
+		items, keys = ds.items, ds.keys
+		live = [i for i in ds.order[:ds.size] if items[i] is not None]
+		remap = {-(i + 1): -(j + 1) for j, i in enumerate(live)}
+		ds.items = [items[i] for i in live]
+		if keys is not None:
+			ds.keys = [keys[i] for i in live]
+		ds.order = list(range(len(live)))
+		ds.where = ds.order[:]
+		ds.size = ds.size_max = len(live)
+		ds.shrink_at = int(ds.size * ds.low_water)
+		return remap
+
+	def update (ds, cur: int, new_item: T) -> int:
+		'''
+		Changes the item behind handle `cur` and returns the handle to use
+		from then on. Heap entries get sifted in place and keep their handle.
+		A presorted entry stays put if `new_item` still fits between its
+		neighbours in `order`, otherwise it moves into the heap and the new
+		heap handle is returned instead
+		'''
+		if cur >= 0:
+			return ds.heap.update(cur, new_item)
+		i = -(cur + 1)
+		assert i < ds.size_max and (ds.items[i] is not None)
+		if not ds.initialized:
+			ds.items[i] = new_item
+			if ds.keys is not None:
+				ds.keys[i] = ds.key(new_item)
+			return cur
+		p = ds.where[i]
+		assert p < ds.size
+		items, order, cmp = ds.items, ds.order, ds.cmp
+		if ds.keys is not None:
+			# same checks as below, on the stored keys
+			keys = ds.keys
+			new_key = ds.key(new_item)
+			fits = True
+			if p + 1 < ds.size:
+				fits = items[order[p+1]] is not None and keys[order[p+1]] <= new_key
+			if fits and p > 0:
+				fits = items[order[p-1]] is not None and new_key <= keys[order[p-1]]
+			if fits:
+				items[i] = new_item
+				keys[i] = new_key
+				return cur
+			ds.delete(cur)
+			return ds.heap.insert(new_item)
+		# `order` runs from the largest down, so the entry after is the lower
+		# bound and the one before the upper bound. checking the lower one
+		# first fails fastest for decrease-key. holes next to it just send it
+		# to the heap rather than searching past them
+		fits = True
+		if p + 1 < ds.size:
+			below = items[order[p+1]]
+			fits = below is not None and cmp(below, new_item)
+		if fits and p > 0:
+			above = items[order[p-1]]
+			fits = above is not None and cmp(new_item, above)
+		if fits:
+			items[i] = new_item
+			return cur
+		ds.delete(cur)
+		return ds.heap.insert(new_item)
+
+	def min (ds) -> T:
+		if ds.size == 0:
+			return ds.heap.min()
+		if not ds.heap.is_empty() and ds._heap_first():
+			return ds.heap.min()
+		return ds[ds.size-1]
+
+	def __len__ (ds):
+		return ds.size
+
+	def __delitem__ (ds, cur: int):
+		ds.delete(cur)
+
+	def __iter__ (ds):
+		'''
+		Lazily yields every item in order without taking any out, merging the
+		presorted array with `Heap.ordered_handles`. The queue mustn't change
+		while this is going
+		'''
+		# before `init` the items are there but `order` isn't
+		assert ds.initialized or ds.size == 0, 'iterating before init'
+		heap, items, order = ds.heap, ds.items, ds.order
+		h_vals, s_vals, leq = ds._merge_parts()
+		handles = heap.ordered_handles()
+		h = next(handles, None)
+		p = ds.size - 1
+		while True:
+			while p >= 0 and items[order[p]] is None:
+				p -= 1
+			if p < 0:
+				break
+			i = order[p]
+			if h is not None and leq(h_vals[h], s_vals[i]):
+				yield heap.items[h]
+				h = next(handles, None)
+			else:
+				yield items[i]
+				p -= 1
+		while h is not None:
+			yield heap.items[h]
+			h = next(handles, None)
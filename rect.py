@@ -1,96 +1,433 @@
-def _pins_side_prop (_attr, _twinattr, _cmp):
-	get = lambda self: getattr(self, _attr)
-	def set (self, v):
-		twin = getattr(self, _twinattr)
-		if getattr(v, _cmp)(twin):
-			setattr(self, _attr, twin)
-			setattr(self, _twinattr, v)
-		else:
-			setattr(self, _attr, v)
-	return property(fget = get, fset = set)
-
-
-class Pins:
-	__slots__ = '_l', '_t', '_r', '_b'
-	def __init__ (self, left = None, top = None, right = None, bottom = None):
-		l = t = r = b = 0
-		if top is None:
-			if left is None:
-				pass
-			elif isinstance(left, Pins):
-				l = left._l
-				t = left._t
-				r = left._r
-				b = left._b
-			elif isinstance(left, int|float):
-				l = t = r = b = float(left)
-		elif right is None:
-			l = t = left
-			r = b = top
-		else:
-			l = left
-			t = top
-			r = right
-			b = bottom
-
-		self._l: float = l
-		self._t: float = t
-		self._r: float = r
-		self._b: float = b
-
-	left:   float = _pins_side_prop('_l', '_r', '__gt__')
-	right:  float = _pins_side_prop('_r', '_l', '__lt__')
-	top:    float = _pins_side_prop('_t', '_b', '__gt__')
-	bottom: float = _pins_side_prop('_b', '_t', '__lt__')
-
-	@property
-	def width (self):
-		return self._r - self._l
-	
-	@property
-	def height (self):
-		return self._b - self._t
-
-	def __iter__ (self):
-		return (getattr(self, k) for k in self.__slots__)
-
-	def __getitem__ (self, i) -> float:
-		return getattr(self, self.__slots__[i])
-
-	def __setitem__ (self, i, v: float):
-		setattr(self, self.__slots__[i], v)
-
-	def __repr__ (self):
-		return f'{self._l}, {self._t}, {self._r}, {self._b}'
-
-	def extend_corners (self, x, y):
-		if x < self._l:
-			self._l = x
-		if y < self._t:
-			self._t = y
-		if x > self._r:
-			self._r = x
-		if y > self._b:
-			self._b = y
-
-	def __eq__ (self, other):
-		if hasattr(other, '__iter__'):
-			return all(a == b for a, b in zip(self, other))
-		else:
-			return all(a == other for a in self)
-
-	@classmethod
-	@property
-	def INF (cls):
-		return cls(float('inf'), float('-inf'))
-
-
-if __name__ == '__main__':
-	bbox = Pins(-10, -20, 30, 40)
-	print(bbox)
-	bbox2 = Pins(bbox)
-	bbox.left = 50
-	print(*bbox, bbox2)
-
-	print(Pins.INF)
-
+import sys
+from array import array
+from itertools import chain, compress, repeat
+from operator import attrgetter, le, sub
+from typing import Self
+
+_INF = float('inf')
+
+# a copy of `coord/ds_coord_buffer.py`'s, which this can't import, keep the two in step
+# native float64 as `memoryview.format` spells it, with or without a byte order
+_DOUBLE = frozenset(('d', '@d', '=d', '<d' if sys.byteorder == 'little' else '>d'))
+
+
+def as_doubles (buffer) -> memoryview:
+	'''
+	A flat float64 `memoryview` over a float64 buffer or raw bytes, no copy.
+	Any other format would come out as garbage read as doubles, so it's a
+	`TypeError` instead
+	'''
+	mv = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+	if mv.format in _DOUBLE:
+		return mv if mv.format == 'd' and mv.ndim == 1 else mv.cast('B').cast('d')
+	if mv.format == 'B':
+		return mv.cast('d') if mv.ndim == 1 else mv.cast('B').cast('d')
+	raise TypeError(f"expected a float64 or bytes buffer, not one of format '{mv.format}'")
+
+
+def _tuples (items, names: tuple[str, ...]):
+	'''
+	`items` as an iterable of plain tuples. `items` can be a flat float64
+	buffer, objects with `names` as attributes (IE `Co2`s or `Pins`) or
+	tuples already
+	'''
+	if isinstance(items, bytes|bytearray|memoryview) or hasattr(items, 'typecode'):
+		# one strided view per field, so zipping them is all C
+		mv = as_doubles(items)
+		k = len(names)
+		return zip(*(mv[i::k] for i in range(k)))
+	it = iter(items)
+	first = next(it, None)
+	if first is None:
+		return ()
+	it = chain((first,), it)
+	if hasattr(first, names[0]):
+		return map(attrgetter(*names), it)
+	return it
+
+
+def _pins_side_prop (_attr, _twinattr, _cmp):
+	get = lambda self: getattr(self, _attr)
+	def set (self, v):
+		twin = getattr(self, _twinattr)
+		if getattr(v, _cmp)(twin):
+			setattr(self, _attr, twin)
+			setattr(self, _twinattr, v)
+		else:
+			setattr(self, _attr, v)
+	return property(fget = get, fset = set)
+
+
+class Pins:
+	__slots__ = '_l', '_t', '_r', '_b'
+	def __init__ (self, left = None, top = None, right = None, bottom = None):
+		l = t = r = b = 0
+		if top is None:
+			if left is None:
+				pass
+			elif isinstance(left, Pins):
+				l = left._l
+				t = left._t
+				r = left._r
+				b = left._b
+			elif isinstance(left, int|float):
+				l = t = r = b = float(left)
+		elif right is None:
+			l = t = left
+			r = b = top
+		else:
+			l = left
+			t = top
+			r = right
+			b = bottom
+
+		self._l: float = l
+		self._t: float = t
+		self._r: float = r
+		self._b: float = b
+
+	left:   float = _pins_side_prop('_l', '_r', '__gt__')
+	right:  float = _pins_side_prop('_r', '_l', '__lt__')
+	top:    float = _pins_side_prop('_t', '_b', '__gt__')
+	bottom: float = _pins_side_prop('_b', '_t', '__lt__')
+
+	@property
+	def width (self):
+		return self._r - self._l
+	
+	@property
+	def height (self):
+		return self._b - self._t
+
+	@property
+	def area (self):
+		return (self._r - self._l) * (self._b - self._t)
+
+	def intersects (self, other: Self) -> bool:
+		'Whether the boxes overlap, touching edges count'
+		return (self._l <= other._r and other._l <= self._r and
+		        self._t <= other._b and other._t <= self._b)
+
+	def intersection (self, other: Self) -> Self | None:
+		'The overlapping part of both boxes, or `None` if they don\'t overlap'
+		if not self.intersects(other):
+			return None
+		return self._make(max(self._l, other._l), max(self._t, other._t),
+		                  min(self._r, other._r), min(self._b, other._b))
+
+	def union (self, other: Self) -> Self:
+		'The smallest box containing both boxes'
+		return self._make(min(self._l, other._l), min(self._t, other._t),
+		                  max(self._r, other._r), max(self._b, other._b))
+
+	def contains (self, other) -> bool:
+		'''
+		Whether `other` lies completely inside this box, edges included.
+		`other` can be another `Pins`, a `Co2` or an `(x, y)` pair
+		'''
+		if isinstance(other, Pins):
+			return (self._l <= other._l and other._r <= self._r and
+			        self._t <= other._t and other._b <= self._b)
+		if hasattr(other, 'x'):
+			x, y = other.x, other.y
+		else:
+			x, y = other
+		return self._l <= x <= self._r and self._t <= y <= self._b
+
+	def __contains__ (self, other) -> bool:
+		return self.contains(other)
+
+	def __iter__ (self):
+		return iter((self._l, self._t, self._r, self._b))
+
+	def __getitem__ (self, i) -> float:
+		return (self._l, self._t, self._r, self._b)[i]
+
+	def __setitem__ (self, i, v: float):
+		setattr(self, self.__slots__[i], v)
+
+	def __repr__ (self):
+		return f'{self._l}, {self._t}, {self._r}, {self._b}'
+
+	def extend_corners (self, x, y):
+		if x < self._l:
+			self._l = x
+		if y < self._t:
+			self._t = y
+		if x > self._r:
+			self._r = x
+		if y > self._b:
+			self._b = y
+
+	def __eq__ (self, other):
+		if hasattr(other, '__iter__'):
+			return all(a == b for a, b in zip(self, other))
+		else:
+			return all(a == other for a in self)
+
+	@classmethod
+	def _make (cls, l: float, t: float, r: float, b: float) -> Self:
+		new = cls.__new__(cls)
+		new._l = l
+		new._t = t
+		new._r = r
+		new._b = b
+		return new
+
+	@classmethod
+	@property
+	def INF (cls):
+		'''
+		An "inside-out" box that any point or box extends. This is still a new
+		`Pins` each time since they're mutable and usually get grown in place.
+		'''
+		return cls._make(_INF, _INF, -_INF, -_INF)
+
+	@classmethod
+	def from_points (cls, points) -> Self:
+		'''
+		The bounding box of a sequence of `Co2`s, `(x, y)` tuples or a flat
+		`x0, y0, x1, y1, ...` float64 buffer, in a single pass over plain
+		locals rather than an `extend_corners` call per point.
+		An empty input gives `Pins.INF`.
+		'''
+		l = t = _INF
+		r = b = -_INF
+		for x, y in _tuples(points, ('x', 'y')):
+			if x < l: l = x
+			if x > r: r = x
+			if y < t: t = y
+			if y > b: b = y
+		return cls._make(l, t, r, b)
+
+	@classmethod
+	def union_all (cls, boxes) -> Self:
+		'''
+		The box enclosing every `Pins` (or `(l, t, r, b)` tuple, or run of four
+		floats in a buffer) in `boxes`. An empty input gives `Pins.INF`.
+		'''
+		l = t = _INF
+		r = b = -_INF
+		rows = boxes
+		if isinstance(boxes, list|tuple) and len(boxes) > 0 and isinstance(boxes[0], Pins):
+			try:
+				for box in boxes:
+					if box._l < l: l = box._l
+					if box._t < t: t = box._t
+					if box._r > r: r = box._r
+					if box._b > b: b = box._b
+				return cls._make(l, t, r, b)
+			except AttributeError:
+				# tuples further on, which unpack the same as `Pins` do. going
+				# over the first ones again doesn't change the union
+				pass
+		else:
+			rows = _tuples(boxes, cls.__slots__)
+		for bl, bt, br, bb in rows:
+			if bl < l: l = bl
+			if bt < t: t = bt
+			if br > r: r = br
+			if bb > b: b = bb
+		return cls._make(l, t, r, b)
+
+	def extend_points (self, points):
+		'`extend_corners` for a whole batch of points at once'
+		box = Pins.from_points(points)
+		if box._l < self._l:
+			self._l = box._l
+		if box._t < self._t:
+			self._t = box._t
+		if box._r > self._r:
+			self._r = box._r
+		if box._b > self._b:
+			self._b = box._b
+
+
+def _column (values) -> array:
+	return values if isinstance(values, array) else array('d', values)
+
+def _doubles (values) -> array:
+	# an `array` built from a list is sized once, from an iterator it grows
+	# an append at a time
+	return array('d', list(values))
+
+
+class PinsArray:
+	'''
+	A batch of boxes stored as four parallel `array('d')` columns (`l`, `t`,
+	`r`, `b`) instead of a `Pins` object each. Indexing a single row gives
+	back a regular `Pins`, everything else works a whole column at a time
+	through `map` so the per-box work stays inside the interpreter's C loops.
+
+	Every value read out of a column becomes a new float, where a `Pins`
+	already holds its own, so there's no `area` or `bounds` here: a column
+	reduction can't beat a loop over `Pins`, and `width`/`height` or
+	`Pins.union_all(arr.tobuffer())` do it when needed.
+	'''
+	__slots__ = 'l', 't', 'r', 'b'
+
+	def __init__ (self, src = None):
+		if src is None:
+			cols = [array('d') for _ in range(4)]
+		elif isinstance(src, int):
+			cols = [array('d', bytes(8 * src)) for _ in range(4)]
+		elif isinstance(src, PinsArray):
+			cols = [array('d', c) for c in (src.l, src.t, src.r, src.b)]
+		elif isinstance(src, bytes|bytearray|memoryview) or hasattr(src, 'typecode'):
+			# a flat `l0, t0, r0, b0, l1, ...` float64 buffer
+			mv = as_doubles(src)
+			if len(mv) % 4 != 0:
+				raise ValueError(f"Buffer of length {len(mv)} isn't a multiple of 4")
+			cols = [array('d', mv[i::4]) for i in range(4)]
+		else:
+			src = src if isinstance(src, list|tuple) else list(src)
+			try:
+				# a column at a time straight off the slots of `Pins`
+				cols = [_doubles(map(attrgetter(k), src)) for k in Pins.__slots__]
+			except AttributeError:
+				# `(l, t, r, b)` tuples, maybe mixed in with `Pins`
+				cols = [array('d', c) for c in zip(*src)] or [array('d') for _ in range(4)]
+		self.l, self.t, self.r, self.b = cols
+
+	@classmethod
+	def _new (cls, l: array, t: array, r: array, b: array) -> Self:
+		new = cls.__new__(cls)
+		new.l = l
+		new.t = t
+		new.r = r
+		new.b = b
+		return new
+
+	@classmethod
+	def from_columns (cls, l, t, r, b) -> Self:
+		cols = tuple(map(_column, (l, t, r, b)))
+		if len(set(map(len, cols))) > 1:
+			raise ValueError(f'Columns differ in length: {[len(c) for c in cols]}')
+		return cls._new(*cols)
+
+	def tobuffer (self) -> array:
+		'The boxes interleaved into one flat `l0, t0, r0, b0, l1, ...` array'
+		out = array('d', bytes(32 * len(self)))
+		for i, c in enumerate((self.l, self.t, self.r, self.b)):
+			out[i::4] = c
+		return out
+
+	def __len__ (self):
+		return len(self.l)
+
+	def __iter__ (self):
+		return map(Pins._make, self.l, self.t, self.r, self.b)
+
+	def __repr__ (self):
+		return f"PinsArray([{'; '.join(repr(p) for p in self)}])"
+
+	def row (self, i: int) -> Pins:
+		return Pins._make(self.l[i], self.t[i], self.r[i], self.b[i])
+
+	def set_row (self, i: int, box):
+		if isinstance(box, Pins):
+			self.l[i], self.t[i], self.r[i], self.b[i] = box._l, box._t, box._r, box._b
+		else:
+			self.l[i], self.t[i], self.r[i], self.b[i] = box
+
+	def __getitem__ (self, index):
+		if isinstance(index, int):
+			return self.row(index)
+		elif isinstance(index, slice):
+			return self._new(self.l[index], self.t[index], self.r[index], self.b[index])
+		raise TypeError(f'Invalid index type {type(index).__name__}')
+
+	def __setitem__ (self, index: int, box):
+		if not isinstance(index, int):
+			raise TypeError(f'Invalid index type {type(index).__name__}')
+		self.set_row(index, box)
+
+	def append (self, box):
+		if isinstance(box, Pins):
+			box = box._l, box._t, box._r, box._b
+		for c, v in zip((self.l, self.t, self.r, self.b), box):
+			c.append(v)
+
+	def extend (self, boxes):
+		if not isinstance(boxes, PinsArray):
+			boxes = PinsArray(boxes)
+		self.l.extend(boxes.l)
+		self.t.extend(boxes.t)
+		self.r.extend(boxes.r)
+		self.b.extend(boxes.b)
+
+	def take (self, rows) -> Self:
+		'The boxes at the indices in `rows`, in that order'
+		rows = rows if isinstance(rows, list) else list(rows)
+		return self._new(*(_doubles(map(c.__getitem__, rows)) for c in (self.l, self.t, self.r, self.b)))
+
+	def width (self) -> array:
+		return _doubles(map(sub, self.r, self.l))
+
+	def height (self) -> array:
+		return _doubles(map(sub, self.b, self.t))
+
+	def normalize (self):
+		'''
+		Swaps sides in-place wherever `l > r` or `t > b`, what the `Pins`
+		side setters do one assignment at a time
+		'''
+		l, t, r, b = self.l, self.t, self.r, self.b
+		self.l, self.r = _doubles(map(min, l, r)), _doubles(map(max, l, r))
+		self.t, self.b = _doubles(map(min, t, b)), _doubles(map(max, t, b))
+
+	def _sides_of (self, other):
+		'Columns of `other` to `map` against, broadcasting a single box'
+		if isinstance(other, PinsArray):
+			if len(other) != len(self):
+				raise ValueError(f"Can't combine PinsArrays of {len(self)} and {len(other)} boxes")
+			return other.l, other.t, other.r, other.b
+		if not isinstance(other, Pins):
+			other = Pins(*other)
+		return repeat(other._l), repeat(other._t), repeat(other._r), repeat(other._b)
+
+	def union (self, other) -> Self:
+		'Per-row union against another `PinsArray` of the same length, or a single box'
+		ol, ot, or_, ob = self._sides_of(other)
+		return self._new(_doubles(map(min, self.l, ol)), _doubles(map(min, self.t, ot)),
+		                 _doubles(map(max, self.r, or_)), _doubles(map(max, self.b, ob)))
+
+	def intersection (self, other) -> Self:
+		'''
+		Per-row intersection against another `PinsArray` of the same length, or
+		a single box. Rows that don't overlap come out inside-out (negative
+		width or height) rather than `None` like `Pins.intersection`
+		'''
+		ol, ot, or_, ob = self._sides_of(other)
+		return self._new(_doubles(map(max, self.l, ol)), _doubles(map(max, self.t, ot)),
+		                 _doubles(map(min, self.r, or_)), _doubles(map(min, self.b, ob)))
+
+	def query (self, box) -> list[int]:
+		'Indices of the boxes overlapping `box`, touching edges count'
+		if not isinstance(box, Pins):
+			box = Pins(*box)
+		bl, bt, br, bb = box._l, box._t, box._r, box._b
+		l, t, r, b = self.l, self.t, self.r, self.b
+		# the whole `l` column gets compared inside `compress`, only the rows
+		# that pass go on to the other three sides
+		return [i for i in compress(range(len(l)), map(le, l, repeat(br)))
+		        if r[i] >= bl and t[i] <= bb and b[i] >= bt]
+
+	def filter (self, box) -> Self:
+		'The boxes overlapping `box` as a new `PinsArray`'
+		return self.take(self.query(box))
+
+
+if __name__ == '__main__':
+	bbox = Pins(-10, -20, 30, 40)
+	print(bbox)
+	bbox2 = Pins(bbox)
+	bbox.left = 50
+	print(*bbox, bbox2)
+
+	print(Pins.INF)
+
+	boxes = PinsArray([Pins(0, 0, 2, 2), (5, 5, 3, 3), bbox])
+	boxes.normalize()
+	print(boxes, boxes.width(), boxes.query(Pins(1, 1, 4, 4)))
+
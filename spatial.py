@@ -0,0 +1,532 @@
+from heapq import heappop, heappush, heapreplace
+from math import ceil, floor, sqrt
+from rect import Pins, as_doubles
+
+
+def _xy (p) -> tuple[float, float]:
+	'`(x, y)` of a `Co2`-like or of a plain `(x, y)` pair'
+	if hasattr(p, 'x'):
+		return p.x, p.y
+	return p[0], p[1]
+
+def _columns (points) -> tuple[list[float], list[float]]:
+	'xs and ys of a flat `x0, y0, x1, y1, ...` float64 buffer or of a sequence of points'
+	if isinstance(points, bytes|bytearray|memoryview) or hasattr(points, 'typecode'):
+		mv = as_doubles(points)
+		return mv[0::2].tolist(), mv[1::2].tolist()
+	xs = list[float]()
+	ys = list[float]()
+	for p in points:
+		x, y = _xy(p)
+		xs.append(x)
+		ys.append(y)
+	return xs, ys
+
+def _ring (cx: int, cy: int, r: int):
+	'Cells at exactly chebyshev distance `r` from `(cx, cy)`'
+	if r == 0:
+		yield cx, cy
+		return
+	for x in range(cx - r, cx + r + 1):
+		yield x, cy - r
+		yield x, cy + r
+	for y in range(cy - r + 1, cy + r):
+		yield cx - r, y
+		yield cx + r, y
+
+
+class PointGrid:
+	'''
+	A uniform grid (hashed, so empty space costs nothing) over 2d points, for
+	nearest-neighbour, radius and box queries without scanning every point.
+
+	Points are referred to by the integer id `insert` hands out. For a grid
+	bulk built with `from_points`, the ids are just the input indices.
+	Deleted ids get reused by later inserts, the same as `queues.Heap` handles.
+	'''
+	__slots__ = 'cell', 'inv', 'cells', 'xs', 'ys', 'free', 'count', 'extent'
+
+	def __init__ (self, cell: float = 1.0):
+		self.cell = float(cell)
+		self.inv = 1.0 / self.cell
+		self.cells: dict[tuple[int, int], list[int]] = {}
+		self.xs = list[float]()
+		self.ys = list[float]()
+		self.free = list[int]()
+		self.count = 0
+		# occupied cell range, only ever grows
+		self.extent: list[int] = None
+
+	@classmethod
+	def from_points (cls, points, cell: float = None):
+		'''
+		Bulk builds a grid from a sequence of `Co2`s/`(x, y)`s or a flat
+		float64 buffer. With no `cell` size given, one is picked so that there
+		are about two points per occupied cell if they were spread evenly.
+		'''
+		xs, ys = _columns(points)
+		if cell is None:
+			cell = 1.0
+			if len(xs) > 0:
+				area = (max(xs) - min(xs)) * (max(ys) - min(ys))
+				if area > 0.0:
+					cell = sqrt(2.0 * area / len(xs))
+		ds = cls(cell)
+		ds.xs = xs
+		ds.ys = ys
+		ds.count = len(xs)
+		inv = ds.inv
+		cells = ds.cells
+		for i, key in enumerate(zip((floor(x * inv) for x in xs), (floor(y * inv) for y in ys))):
+			ids = cells.get(key)
+			if ids is None:
+				cells[key] = [i]
+			else:
+				ids.append(i)
+		if len(cells) > 0:
+			kx = [k[0] for k in cells]
+			ky = [k[1] for k in cells]
+			ds.extent = [min(kx), min(ky), max(kx), max(ky)]
+		return ds
+
+	def _key (ds, x: float, y: float) -> tuple[int, int]:
+		return floor(x * ds.inv), floor(y * ds.inv)
+
+	def insert (ds, p) -> int:
+		x, y = _xy(p)
+		if len(ds.free) > 0:
+			i = ds.free.pop()
+			ds.xs[i] = x
+			ds.ys[i] = y
+		else:
+			i = len(ds.xs)
+			ds.xs.append(x)
+			ds.ys.append(y)
+		key = kx, ky = ds._key(x, y)
+		ids = ds.cells.get(key)
+		if ids is None:
+			ds.cells[key] = [i]
+		else:
+			ids.append(i)
+		e = ds.extent
+		if e is None:
+			ds.extent = [kx, ky, kx, ky]
+		else:
+			if kx < e[0]: e[0] = kx
+			if ky < e[1]: e[1] = ky
+			if kx > e[2]: e[2] = kx
+			if ky > e[3]: e[3] = ky
+		ds.count += 1
+		return i
+
+	def delete (ds, i: int):
+		x = ds.xs[i]
+		assert x is not None
+		key = ds._key(x, ds.ys[i])
+		ids = ds.cells[key]
+		ids.remove(i)
+		if len(ids) == 0:
+			del ds.cells[key]
+		ds.xs[i] = ds.ys[i] = None
+		ds.free.append(i)
+		ds.count -= 1
+
+	def point (ds, i: int) -> tuple[float, float]:
+		return ds.xs[i], ds.ys[i]
+
+	def __len__ (ds):
+		return ds.count
+
+	def __delitem__ (ds, i: int):
+		ds.delete(i)
+
+	def bounds (ds) -> Pins:
+		'The bounding box of every point, `Pins.INF` when empty'
+		xs = [x for x in ds.xs if x is not None]
+		if len(xs) == 0:
+			return Pins.INF
+		ys = [y for y in ds.ys if y is not None]
+		return Pins(min(xs), min(ys), max(xs), max(ys))
+
+	def _cells_in (ds, l: float, t: float, r: float, b: float):
+		'The id lists of every occupied cell touching the box'
+		if ds.extent is None:
+			return
+		el, et, er, eb = ds.extent
+		# into the extent, a cell wider all round against rounding, before
+		# flooring, since an infinite side would overflow `floor`
+		c = ds.cell
+		x0, y0, x1, y1 = (el - 1) * c, (et - 1) * c, (er + 1) * c, (eb + 1) * c
+		kl, kt = ds._key(min(max(l, x0), x1), min(max(t, y0), y1))
+		kr, kb = ds._key(min(max(r, x0), x1), min(max(b, y0), y1))
+		kl = max(kl, el); kt = max(kt, et)
+		kr = min(kr, er); kb = min(kb, eb)
+		if kl > kr or kt > kb:
+			return
+		cells = ds.cells
+		if (kr - kl + 1) * (kb - kt + 1) > len(cells):
+			# sparse grid, cheaper to walk what's there
+			for (kx, ky), ids in cells.items():
+				if kl <= kx <= kr and kt <= ky <= kb:
+					yield ids
+			return
+		for kx in range(kl, kr + 1):
+			for ky in range(kt, kb + 1):
+				ids = cells.get((kx, ky))
+				if ids is not None:
+					yield ids
+
+	def query_rect (ds, box: Pins) -> list[int]:
+		'Ids of every point inside `box`, edges included'
+		l, t, r, b = box
+		xs, ys = ds.xs, ds.ys
+		out = list[int]()
+		for ids in ds._cells_in(l, t, r, b):
+			for i in ids:
+				if l <= xs[i] <= r and t <= ys[i] <= b:
+					out.append(i)
+		return out
+
+	def query_radius (ds, p, radius: float) -> list[int]:
+		'Ids of every point within `radius` of `p`'
+		px, py = _xy(p)
+		r2 = radius * radius
+		xs, ys = ds.xs, ds.ys
+		out = list[int]()
+		for ids in ds._cells_in(px - radius, py - radius, px + radius, py + radius):
+			for i in ids:
+				dx = xs[i] - px
+				dy = ys[i] - py
+				if dx*dx + dy*dy <= r2:
+					out.append(i)
+		return out
+
+	def nearest (ds, p, k: int = 1) -> list[int]:
+		'''
+		Ids of the `k` closest points to `p`, closest first. Searches outwards
+		one ring of cells at a time and stops once the next ring can't be any
+		closer than the current `k`th best.
+		'''
+		if ds.count == 0 or k <= 0:
+			return []
+		k = min(k, ds.count)
+		px, py = _xy(p)
+		cx, cy = ds._key(px, py)
+		cell = ds.cell
+		cells, xs, ys = ds.cells, ds.xs, ds.ys
+		el, et, er, eb = ds.extent
+		# max-heap of the best `k` so far as `(-dist_squared, id)`
+		best = list[tuple[float, int]]()
+		r = max(el - cx, cx - er, et - cy, cy - eb, 0)
+		while True:
+			for key in _ring(cx, cy, r):
+				ids = cells.get(key)
+				if ids is None:
+					continue
+				for i in ids:
+					dx = xs[i] - px
+					dy = ys[i] - py
+					d = dx*dx + dy*dy
+					if len(best) < k:
+						heappush(best, (-d, i))
+					elif d < -best[0][0]:
+						heapreplace(best, (-d, i))
+			if cx - r <= el and cx + r >= er and cy - r <= et and cy + r >= eb:
+				break
+			if len(best) == k:
+				edge = min(px - (cx - r) * cell, (cx + r + 1) * cell - px,
+				           py - (cy - r) * cell, (cy + r + 1) * cell - py)
+				if edge * edge >= -best[0][0]:
+					break
+			r += 1
+		best.sort(key=lambda e: (-e[0], e[1]))
+		return [i for _, i in best]
+
+
+def _box_dist2 (box: Pins, x: float, y: float) -> float:
+	'Squared distance from a point to the closest part of a box, 0 inside'
+	dx = box._l - x if x < box._l else (x - box._r if x > box._r else 0.0)
+	dy = box._t - y if y < box._t else (y - box._b if y > box._b else 0.0)
+	return dx*dx + dy*dy
+
+def _enlarged (box: Pins, other: Pins) -> float:
+	'How much `box`\'s area grows to fit `other`'
+	return box.union(other).area - box.area
+
+
+class _RNode:
+	__slots__ = 'box', 'leaf', 'children', 'parent'
+	def __init__ (self, leaf: bool, children: list = None, parent = None):
+		self.box: Pins = Pins.INF
+		self.leaf = leaf
+		# ids of entries for leaves, other `_RNode`s otherwise
+		self.children: list = list() if children is None else children
+		self.parent: _RNode = parent
+
+
+class RTree:
+	'''
+	An R-tree of `Pins` boxes, each with a payload, for overlap, point-in and
+	nearest queries without testing every box.
+
+	`bulk_load` packs the tree bottom up (sort-tile-recursive), which gives
+	the tightest tree for a known set of boxes. `insert`/`delete` keep it up
+	to date afterwards, splitting full nodes the quadratic way from Guttman's
+	paper. Like `PointGrid`, boxes are referred to by the id `insert` returns
+	(the input index for `bulk_load`) and deleted ids get reused.
+	'''
+	__slots__ = 'root', 'max_entries', 'min_entries', 'boxes', 'payloads', 'leaf_of', 'free', 'count'
+
+	def __init__ (self, max_entries: int = 16):
+		assert max_entries >= 4
+		self.max_entries = max_entries
+		self.min_entries = max_entries // 3
+		self.root = _RNode(leaf=True)
+		self.boxes = list[Pins]()
+		self.payloads = list()
+		self.leaf_of = list[_RNode]()
+		self.free = list[int]()
+		self.count = 0
+
+	@classmethod
+	def bulk_load (cls, items, max_entries: int = 16):
+		'''
+		Builds a packed tree from `(box, payload)` pairs. `box` can be a `Pins`
+		or an `(l, t, r, b)` tuple, and gets copied either way
+		'''
+		ds = cls(max_entries)
+		for box, payload in items:
+			ds.boxes.append(Pins(box) if isinstance(box, Pins) else Pins(*box))
+			ds.payloads.append(payload)
+		n = ds.count = len(ds.boxes)
+		ds.leaf_of = [None] * n
+		if n == 0:
+			return ds
+		boxes = ds.boxes
+		cx = [(b._l + b._r) for b in boxes]
+		cy = [(b._t + b._b) for b in boxes]
+		level = ds._pack(list(range(n)), cx, cy, leaf=True)
+		while len(level) > 1:
+			cx = [(nd.box._l + nd.box._r) for nd in level]
+			cy = [(nd.box._t + nd.box._b) for nd in level]
+			level = ds._pack(level, cx, cy, leaf=False)
+		ds.root = level[0]
+		return ds
+
+	def _pack (ds, items: list, cx: list, cy: list, leaf: bool) -> list[_RNode]:
+		'One level of sort-tile-recursive packing, `cx`/`cy` are the centres of `items`'
+		m = ds.max_entries
+		slabs = ceil(sqrt(ceil(len(items) / m)))
+		order = sorted(range(len(items)), key=cx.__getitem__)
+		per_slab = slabs * m
+		out = list[_RNode]()
+		for s in range(0, len(order), per_slab):
+			slab = sorted(order[s:s + per_slab], key=cy.__getitem__)
+			for i in range(0, len(slab), m):
+				node = _RNode(leaf, [items[j] for j in slab[i:i + m]])
+				ds._adopt(node)
+				out.append(node)
+		return out
+
+	def _adopt (ds, node: _RNode):
+		'Points the children back at `node` and recomputes its box'
+		if node.leaf:
+			for i in node.children:
+				ds.leaf_of[i] = node
+			node.box = Pins.union_all([ds.boxes[i] for i in node.children])
+		else:
+			for c in node.children:
+				c.parent = node
+			node.box = Pins.union_all([c.box for c in node.children])
+
+	def _child_box (ds, node: _RNode, child) -> Pins:
+		return ds.boxes[child] if node.leaf else child.box
+
+	def __len__ (ds):
+		return ds.count
+
+	def box (ds, i: int) -> Pins:
+		return ds.boxes[i]
+
+	def payload (ds, i: int):
+		return ds.payloads[i]
+
+	def insert (ds, box: Pins, payload = None) -> int:
+		box = Pins(box) if isinstance(box, Pins) else Pins(*box)
+		if len(ds.free) > 0:
+			i = ds.free.pop()
+			ds.boxes[i] = box
+			ds.payloads[i] = payload
+		else:
+			i = len(ds.boxes)
+			ds.boxes.append(box)
+			ds.payloads.append(payload)
+			ds.leaf_of.append(None)
+		ds.count += 1
+
+		l, t, r, b = box._l, box._t, box._r, box._b
+		node = ds.root
+		while not node.leaf:
+			# least enlargement, then least area, inlined as this runs per level
+			best = best_grow = best_area = None
+			for c in node.children:
+				cb = c.box
+				area = (cb._r - cb._l) * (cb._b - cb._t)
+				grow = (max(cb._r, r) - min(cb._l, l)) * (max(cb._b, b) - min(cb._t, t)) - area
+				if best is None or grow < best_grow or (grow == best_grow and area < best_area):
+					best, best_grow, best_area = c, grow, area
+			node = best
+		node.children.append(i)
+		ds.leaf_of[i] = node
+		ds._grow_up(node, box)
+		if len(node.children) > ds.max_entries:
+			ds._split(node)
+		return i
+
+	def _grow_up (ds, node: _RNode, box: Pins):
+		while node is not None:
+			node.box.extend_corners(box._l, box._t)
+			node.box.extend_corners(box._r, box._b)
+			node = node.parent
+
+	def _split (ds, node: _RNode):
+		'''
+		Quadratic split: seed two groups with the pair of children that would
+		waste the most area together, then hand out the rest one at a time to
+		whichever group they enlarge the least
+		'''
+		kids = node.children
+		boxes = [ds._child_box(node, c) for c in kids]
+		worst = None
+		for a in range(len(kids)):
+			for b in range(a + 1, len(kids)):
+				waste = boxes[a].union(boxes[b]).area - boxes[a].area - boxes[b].area
+				if worst is None or waste > worst[0]:
+					worst = waste, a, b
+		_, a, b = worst
+		groups = [[kids[a]], [kids[b]]]
+		bounds = [Pins(boxes[a]), Pins(boxes[b])]
+		rest = [j for j in range(len(kids)) if j != a and j != b]
+		least = ds.min_entries
+		for n, j in enumerate(rest):
+			left = len(rest) - n
+			# make sure both groups end up with at least `min_entries`
+			if len(groups[0]) + left <= least:
+				g = 0
+			elif len(groups[1]) + left <= least:
+				g = 1
+			else:
+				d0 = _enlarged(bounds[0], boxes[j])
+				d1 = _enlarged(bounds[1], boxes[j])
+				g = 0 if (d0, bounds[0].area) <= (d1, bounds[1].area) else 1
+			groups[g].append(kids[j])
+			bounds[g] = bounds[g].union(boxes[j])
+
+		node.children = groups[0]
+		ds._adopt(node)
+		sibling = _RNode(node.leaf, groups[1])
+		ds._adopt(sibling)
+		parent = node.parent
+		if parent is None:
+			root = ds.root = _RNode(False, [node, sibling])
+			ds._adopt(root)
+			return
+		parent.children.append(sibling)
+		sibling.parent = parent
+		if len(parent.children) > ds.max_entries:
+			ds._split(parent)
+
+	def delete (ds, i: int):
+		node = ds.leaf_of[i]
+		assert node is not None
+		node.children.remove(i)
+		ds.leaf_of[i] = None
+		ds.boxes[i] = ds.payloads[i] = None
+		ds.free.append(i)
+		ds.count -= 1
+		# empty nodes are dropped outright, the rest just get their boxes
+		# shrunk back down. underfull nodes are left alone rather than
+		# reinserted, queries stay exact either way
+		while node is not ds.root and len(node.children) == 0:
+			parent = node.parent
+			parent.children.remove(node)
+			node = parent
+		while node is not None:
+			if len(node.children) == 0:
+				node.box = Pins.INF
+			else:
+				ds._adopt(node)
+			node = node.parent
+		root = ds.root
+		while not root.leaf and len(root.children) == 1:
+			root = ds.root = root.children[0]
+			root.parent = None
+
+	def __delitem__ (ds, i: int):
+		ds.delete(i)
+
+	def query (ds, box: Pins) -> list[int]:
+		'Ids of every box overlapping `box`, touching edges count'
+		out = list[int]()
+		if ds.count == 0:
+			return out
+		boxes = ds.boxes
+		stack = [ds.root]
+		while len(stack) > 0:
+			node = stack.pop()
+			if node.leaf:
+				for i in node.children:
+					if boxes[i].intersects(box):
+						out.append(i)
+			else:
+				for c in node.children:
+					if c.box.intersects(box):
+						stack.append(c)
+		return out
+
+	def query_point (ds, p) -> list[int]:
+		'Ids of every box containing the point `p`'
+		x, y = _xy(p)
+		return ds.query(Pins._make(x, y, x, y))
+
+	def query_contained (ds, box: Pins) -> list[int]:
+		'Ids of every box lying completely inside `box`'
+		return [i for i in ds.query(box) if box.contains(ds.boxes[i])]
+
+	def nearest (ds, p, k: int = 1) -> list[int]:
+		'''
+		Ids of the `k` boxes closest to `p`, closest first, where a box
+		containing `p` is at distance 0. Best-first search over the nodes.
+		'''
+		out = list[int]()
+		if ds.count == 0 or k <= 0:
+			return out
+		x, y = _xy(p)
+		# entries are `(dist_squared, tiebreak, is_entry, node_or_id)`
+		heap = [(0.0, 0, False, ds.root)]
+		tick = 1
+		boxes = ds.boxes
+		while len(heap) > 0 and len(out) < k:
+			_, _, is_entry, item = heappop(heap)
+			if is_entry:
+				out.append(item)
+				continue
+			if item.leaf:
+				for i in item.children:
+					heappush(heap, (_box_dist2(boxes[i], x, y), i, True, i))
+			else:
+				for c in item.children:
+					tick += 1
+					heappush(heap, (_box_dist2(c.box, x, y), -tick, False, c))
+		return out
+
+
+if __name__ == '__main__':
+	grid = PointGrid.from_points([(0, 0), (1, 1), (5, 5), (2, 0.5)])
+	print(grid.nearest((1.2, 0.9), 2))
+	print(grid.query_rect(Pins(0, 0, 2, 2)))
+	print(grid.query_radius((0, 0), 1.5), grid.bounds())
+
+	tree = RTree.bulk_load([(Pins(0, 0, 2, 2), 'a'), (Pins(1, 1, 3, 3), 'b'), (Pins(5, 5, 6, 6), 'c')])
+	print([tree.payload(i) for i in tree.query(Pins(1.5, 1.5, 1.6, 1.6))])
+	print([tree.payload(i) for i in tree.nearest((4, 4), 2)])